@@ -4,15 +4,17 @@ Pizza Price Analytics – DuckDB Dimensional Model Builder
 
 Purpose
 -------
-Build a simple star schema from the raw menu CSVs produced by the
-scrapers (Domino’s / Pizza Hut / Pizza Pizza) using DuckDB, and export
+Build a simple star schema from the raw menu files (CSV / Parquet)
+produced by the scrapers (Domino’s / Pizza Hut / Pizza Pizza) using DuckDB, and export
 clean dimension + fact tables as CSV files.
 
 Input
 -----
-All CSVs in:
+All CSV and Parquet files in:
 
     data/raw/*.csv
+    data/raw/*.csv.gz
+    data/raw/*.parquet
 
 (Each file is expected to follow the unified schema:
  chain_key, store_key, city, province, category,
@@ -27,20 +29,23 @@ Dimension CSVs:
     data/clean/dimensions/dim_product.csv
     data/clean/dimensions/dim_date.csv
 
-Fact CSV:
+Fact Parquet (ZSTD-compressed; Power BI and DuckDB read it natively):
 
-    data/clean/fact/fact_menu_price.csv
+    data/clean/fact/fact_menu_price.parquet
 
 Usage
 -----
     python model.py
 
 This script:
-- Reads all raw CSVs with DuckDB (union_by_name).
-- Applies light type casting / cleanup.
+- Reads all raw CSV/Parquet files with DuckDB using the fixed 13-column
+  schema.
+- Applies light cleanup.
 - Builds dim_chain, dim_store, dim_product, dim_date.
-- Builds fact_menu_price referencing those dimensions via hashed keys.
-- Exports each table to the clean folders for downstream BI (e.g. Power BI).
+- Builds fact_menu_price referencing those dimensions via hashed keys
+  (computed once on the staged rows and shared by every table).
+- Exports the dimensions as CSV and the fact table as Parquet to the clean
+  folders for downstream BI (e.g. Power BI).
 """
 
 from __future__ import annotations
@@ -66,6 +71,26 @@ FACT_DIR = Path("data/clean/fact")
 DIM_DIR.mkdir(parents=True, exist_ok=True)
 FACT_DIR.mkdir(parents=True, exist_ok=True)
 
+# Unified raw schema shared by every scraper (column -> DuckDB type)
+RAW_SCHEMA = {
+    "chain_key": "VARCHAR",
+    "store_key": "VARCHAR",
+    "city": "VARCHAR",
+    "province": "VARCHAR",
+    "category": "VARCHAR",
+    "recipe": "VARCHAR",
+    "product_key": "VARCHAR",
+    "size": "VARCHAR",
+    "crust": "VARCHAR",
+    "price": "DOUBLE",
+    "date_key": "DATE",
+    "month": "VARCHAR",
+    "year": "VARCHAR",
+}
+# Typed with TRY_CAST: a malformed cell becomes NULL instead of failing the
+# whole build. CSVs read these as VARCHAR first so bad values reach the cast.
+LENIENT_COLS = {"price", "date_key"}
+
 
 def build_model(
     raw_dir: Path = RAW_DIR,
@@ -73,95 +98,129 @@ def build_model(
     fact_dir: Path = FACT_DIR,
 ) -> None:
     """
-    Build dimensions + fact from raw CSVs and export them as clean CSV files.
+    Build dimensions + fact from raw CSV/Parquet files and export them to the
+    clean folders (dimensions as CSV, fact as Parquet).
     """
 
     # Normalize to forward slashes for DuckDB's globbing
-    raw_glob = str(raw_dir / "*.csv").replace("\\", "/")
+    raw_csv_glob = str(raw_dir / "*.csv").replace("\\", "/")
+    raw_csv_gz_glob = str(raw_dir / "*.csv.gz").replace("\\", "/")
+    raw_parquet_glob = str(raw_dir / "*.parquet").replace("\\", "/")
     dim_dir_str = str(dim_dir).replace("\\", "/")
     fact_dir_str = str(fact_dir).replace("\\", "/")
 
+    # Scrapers write CSV (optionally gzip'd) or Parquet (Pizza Hut defaults
+    # to Parquet); read whichever kinds are present, typed to the same schema.
+    csv_columns = ",\n".join(
+        f"        '{c}': '{'VARCHAR' if c in LENIENT_COLS else t}'"
+        for c, t in RAW_SCHEMA.items()
+    )
+    typed_columns = ",\n".join(
+        f"      {'TRY_CAST' if c in LENIENT_COLS else 'CAST'}({c} AS {t}) AS {c}"
+        for c, t in RAW_SCHEMA.items()
+    )
+
+    def csv_source(glob: str) -> str:
+        # DuckDB picks the gzip codec from the .gz extension
+        return f"""    SELECT
+{typed_columns}
+    FROM read_csv(
+      '{glob}',
+      header = TRUE,
+      auto_detect = FALSE,
+      columns = {{
+{csv_columns}
+      }}
+    )"""
+
+    raw_sources = []
+    has_parquet = any(raw_dir.glob("*.parquet"))
+    has_csv_gz = any(raw_dir.glob("*.csv.gz"))
+    if any(raw_dir.glob("*.csv")) or not (has_parquet or has_csv_gz):
+        raw_sources.append(csv_source(raw_csv_glob))
+    if has_csv_gz:
+        raw_sources.append(csv_source(raw_csv_gz_glob))
+    if has_parquet:
+        raw_sources.append(
+            f"""    SELECT
+{typed_columns}
+    FROM read_parquet('{raw_parquet_glob}', union_by_name = TRUE)"""
+        )
+    raw_union = "\n    UNION ALL\n".join(raw_sources)
+
     sql = f"""
-    -- Stage: read ALL raw CSVs (Pizza Pizza, Domino's, Pizza Hut) from the Raw folder
-    CREATE OR REPLACE VIEW stg AS
-    SELECT *
-    FROM read_csv_auto('{raw_glob}', union_by_name=TRUE, header=TRUE)
+    -- Stage: read ALL raw files (Pizza Pizza, Domino's, Pizza Hut) from the Raw folder.
+    -- The scrapers share a fixed schema, so declare it instead of sniffing
+    -- every file; price/date_key use TRY_CAST as before. Materialized once with all
+    -- surrogate keys, so the raw files are scanned and hashed a single time.
+    CREATE OR REPLACE TEMP TABLE stg_hashed AS
+    SELECT
+      *,
+      hash(chain_key)              AS chain_id,
+      hash(chain_key, store_key)   AS store_id,
+      hash(chain_key, product_key) AS product_id,
+      hash(date_key)               AS date_id
+    FROM (
+{raw_union}
+    )
     -- Global cleanup rule already used in your scrapers, but keep it again for safety:
     WHERE lower(coalesce(product_key, '')) NOT LIKE '%product%';
 
-    -- Cast/standardize types (helps EXTRACT/strftime and numeric ops)
-    CREATE OR REPLACE VIEW stg_typed AS
-    SELECT
-      chain_key,
-      CAST(store_key   AS VARCHAR) AS store_key,
-      CAST(city        AS VARCHAR) AS city,
-      CAST(province    AS VARCHAR) AS province,
-      CAST(category    AS VARCHAR) AS category,
-      CAST(recipe      AS VARCHAR) AS recipe,
-      CAST(product_key AS VARCHAR) AS product_key,
-      CAST(size        AS VARCHAR) AS size,
-      CAST(crust       AS VARCHAR) AS crust,
-      TRY_CAST(price   AS DOUBLE)  AS price,
-      TRY_CAST(date_key AS DATE)   AS date_key,
-      CAST(month       AS VARCHAR) AS month,
-      CAST(year        AS VARCHAR) AS year
-    FROM stg;
-
     -- Dimensions -------------------------------------------------------------
 
     CREATE OR REPLACE TABLE dim_chain AS
     SELECT DISTINCT
-      hash(chain_key) AS chain_id,
+      chain_id,
       chain_key
-    FROM stg_typed
+    FROM stg_hashed
     WHERE chain_key IS NOT NULL;
 
     CREATE OR REPLACE TABLE dim_store AS
     SELECT DISTINCT
-      hash(chain_key, store_key) AS store_id,
-      hash(chain_key)            AS chain_id,
+      store_id,
+      chain_id,
       store_key,
       city,
       province
-    FROM stg_typed;
+    FROM stg_hashed;
 
     CREATE OR REPLACE TABLE dim_product AS
     SELECT DISTINCT
-      hash(chain_key, product_key) AS product_id,
-      hash(chain_key)              AS chain_id,
+      product_id,
+      chain_id,
       product_key,
       recipe,
       size,
       crust,
       category
-    FROM stg_typed;
+    FROM stg_hashed;
 
     CREATE OR REPLACE TABLE dim_date AS
     SELECT DISTINCT
-      hash(date_key)                    AS date_id,
+      date_id,
       date_key,
       EXTRACT(YEAR  FROM date_key)::INT AS year_num,
       EXTRACT(MONTH FROM date_key)::INT AS month_num,
       strftime(date_key, '%B')          AS month_name,
       EXTRACT(DAY   FROM date_key)::INT AS day_num,
       EXTRACT(DOW   FROM date_key)::INT AS dow_num
-    FROM stg_typed
+    FROM stg_hashed
     WHERE date_key IS NOT NULL;
 
     -- Fact -------------------------------------------------------------------
 
     CREATE OR REPLACE TABLE fact_menu_price AS
     SELECT
-      hash(chain_key)              AS chain_id,
-      hash(chain_key, store_key)   AS store_id,
-      hash(chain_key, product_key) AS product_id,
-      hash(date_key)               AS date_id,
+      chain_id,
+      store_id,
+      product_id,
+      date_id,
       price
-    FROM stg_typed
+    FROM stg_hashed
     WHERE price IS NOT NULL
       AND date_key IS NOT NULL;
 
-    -- Export CSVs to Clean folders -------------------------------------------
+    -- Export to Clean folders (dims: CSV, fact: Parquet) ---------------------
 
     COPY (
       SELECT * FROM dim_chain ORDER BY chain_id
@@ -183,17 +242,18 @@ def build_model(
     ) TO '{dim_dir_str}/dim_date.csv'
       WITH (HEADER, DELIMITER ',');
 
+    -- Columnar + compressed: much faster to write and far smaller than CSV
     COPY (
       SELECT * FROM fact_menu_price
-    ) TO '{fact_dir_str}/fact_menu_price.csv'
-      WITH (HEADER, DELIMITER ',');
+    ) TO '{fact_dir_str}/fact_menu_price.parquet'
+      WITH (FORMAT PARQUET, COMPRESSION ZSTD, ROW_GROUP_SIZE 122880);
     """
 
     con = duckdb.connect(database=":memory:")
     con.execute(sql)
     con.close()
 
-    print("✅ Built dimensions & fact and exported CSVs to:")
+    print("✅ Built dimensions & fact and exported clean tables to:")
     print("  DIMS →", dim_dir)
     print("  FACT →", fact_dir)
 
@@ -25,30 +25,44 @@ A CSV file in the local `data/raw/` folder:
 
     data/raw/menu_dominos_ca_menu_<YYYYMMDD>.csv
 
+Store profiles are cached in `data/cache/profile/` for 7 days; delete the
+folder to force a refresh.
+
 Dependencies
 ------------
 - requests
 - pandas
 - tqdm
+- orjson (optional; faster JSON parsing, falls back to `json`)
 
 """
 
 from __future__ import annotations
 
 import concurrent.futures
+import csv
 import datetime
 import html
+import json
 import os
 import re
 import sys
+import time
 import unicodedata
 from pathlib import Path
 from typing import Any, Dict, List, Tuple, Optional
 
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter, Retry
 from tqdm import tqdm
 
+# orjson parses the large menu payloads several times faster; stdlib fallback
+try:  # pragma: no cover - optional dependency
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover
+    from json import loads as json_loads
+
 # -------------------- Configuration --------------------
 
 BASE_URL = "https://order.dominos.ca/power"
@@ -59,10 +73,36 @@ TIMEOUT = 20
 # Constant chain key for Domino's
 CHAIN_KEY = "DP"
 
+# Store ids appear in the store list page as "(#10003)"
+STORE_ID_RX = re.compile(r"\(#(\d{4,5})\)")
+
 # Portfolio-friendly output: relative path inside the repo
 OUTPUT_DIR = Path("data/raw")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
+# Store profiles (name/city/province) barely change, so they are cached on
+# disk between runs; menus are always fetched fresh since prices move.
+PROFILE_CACHE_DIR = Path("data/cache/profile")
+PROFILE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+PROFILE_CACHE_TTL = 7 * 86400  # seconds
+
+# -------------------- Shared HTTP session --------------------
+
+# One keep-alive pool shared by all workers, so each store reuses an open
+# TLS connection instead of handshaking twice (menu + profile).
+SESSION = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=MAX_WORKERS,
+    pool_maxsize=MAX_WORKERS * 2,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[429, 500, 502, 503, 504],
+    ),
+)
+SESSION.mount("http://", _adapter)
+SESSION.mount("https://", _adapter)
+
 # -------------------- Tiny utilities --------------------
 
 
@@ -70,11 +110,12 @@ def tidy(t: Any) -> str:
     """Normalise whitespace/Unicode and strip."""
     if t is None:
         return ""
-    return re.sub(
-        r"\s+",
-        " ",
-        unicodedata.normalize("NFKC", html.unescape(str(t))),
-    ).strip()
+    s = t if isinstance(t, str) else str(t)
+    # Plain ASCII without entities is already NFKC-stable, so only the
+    # whitespace collapse applies (str.split uses the same whitespace as \s).
+    if not s.isascii() or "&" in s:
+        s = unicodedata.normalize("NFKC", html.unescape(s))
+    return " ".join(s.split())
 
 
 def as_float(x: Any) -> Optional[float]:
@@ -122,6 +163,43 @@ def price_of(d: dict) -> Any:
     return ""
 
 
+def iter_flat(obj: Any, prefix: str = "", sep: str = "_"):
+    """
+    Yield (key, value) pairs for every leaf of a nested dict, in source order.
+
+    Nested dict keys are joined with `sep`.
+    """
+    for k, v in obj.items():
+        key = f"{prefix}{sep}{k}" if prefix else str(k)
+        if isinstance(v, dict):
+            yield from iter_flat(v, key, sep)
+        else:
+            yield key, v
+
+
+def flatten(obj: Any, sep: str = "_") -> dict:
+    """
+    Flatten a (possibly nested) JSON object into a single-level dict.
+
+    Same naming/order as `pd.json_normalize`: top-level leaves come before
+    top-level nested dicts, which are then walked in source order.
+    """
+    if isinstance(obj, list):
+        obj = obj[0] if obj else {}
+    if not isinstance(obj, dict):
+        return {}
+    flat = {}
+    nested = []
+    for k, v in obj.items():
+        if isinstance(v, dict):
+            nested.append((str(k), v))
+        else:
+            flat[str(k)] = v
+    for key, v in nested:
+        flat.update(iter_flat(v, key, sep))
+    return flat
+
+
 def extract_province(flat: dict) -> str:
     for k, v in flat.items():
         if (
@@ -177,54 +255,56 @@ def parse_crust_from_name(name: str) -> str:
     return ""
 
 
+# One pass over the name for every size notation; alternatives are listed
+# in priority order and each carries exactly one named group.
+SIZE_RX = re.compile(
+    r'\b(?P<inch>\d{1,2})\s*(?:"|”)\s*(?=\D|$)'          # 10"
+    r"|\b(?P<inch2>\d{1,2})\s*(?:inch|in)\b"               # 10 inch
+    r"|\b(?P<ml>\d{2,4})\s*m\s*l\b"                        # 500 mL
+    r"|\b(?P<litre>\d+(?:\.\d+)?)\s*l(?:itre|iter|iters|itres)?\b"  # 2 L / 2 litre
+    r"|\b(?P<piece_dash>\d{1,3})\s*-\s*piece\b"           # 8-Piece
+    r"|\b(?P<pc>\d{1,3})\s*pc\b"                           # 8 pc
+    r"|\b(?P<pieces>\d{1,3})\s*pieces\b",                  # 8 pieces
+    re.I,
+)
+SIZE_FORMATS = {
+    "inch": '{}"',
+    "inch2": '{}"',
+    "ml": "{} mL",
+    "litre": "{} L",
+    "piece_dash": "{}-Piece",
+    "pc": "{} pc",
+    "pieces": "{}-Piece",
+}
+SIZE_PRIORITY = {name: i for i, name in enumerate(SIZE_FORMATS)}
+
+CODE_LEAD_INCH_RX = re.compile(r"^(\d{1,2})(?=[A-Z])")
+CODE_PC_RX = re.compile(r"(\d{1,3})PC", re.I)
+CODE_LEAD_NUM_RX = re.compile(r"^(\d{1,3})")
+CODE_TRAIL_NUM_RX = re.compile(r"(\d{1,3})$")
+CODE_LEAD_ML_RX = re.compile(r"^(\d{3,4})")
+CODE_LEAD_LITRE_RX = re.compile(r"^(\d+(?:\.\d+)?)L", re.I)
+
+CUP_RX = re.compile(r"\bcup\b", re.I)
+BAG_RX = re.compile(r"\bbag\b", re.I)
+
+
 def parse_size_from_text(name: str) -> str:
     if not name:
         return ""
-    s = name.strip()
 
-    # 10"
-    m = re.search(r'\b(\d{1,2})\s*(?:"|”)\s*(?=\D|$)', s)
-    if m:
-        return f'{m.group(1)}"'
-
-    # 10 inch
-    m = re.search(r"\b(\d{1,2})\s*(?:inch|in)\b", s, flags=re.I)
-    if m:
-        return f'{m.group(1)}"'
-
-    # 500 mL
-    m = re.search(r"\b(\d{2,4})\s*m\s*l\b", s, flags=re.I)
-    if m:
-        return f"{m.group(1)} mL"
+    best = None
+    best_rank = len(SIZE_PRIORITY)
+    for m in SIZE_RX.finditer(name.strip()):
+        rank = SIZE_PRIORITY[m.lastgroup]
+        if rank < best_rank:
+            best, best_rank = m, rank
+            if rank == 0:
+                break
 
-    # 2 litre / 2 liter
-    m = re.search(
-        r"\b(\d+(?:\.\d+)?)\s*l(?:itre|iter|iters|itres)?\b",
-        s,
-        flags=re.I,
-    )
-    if m:
-        return f"{m.group(1)} L"
-
-    # 2 L
-    m = re.search(r"\b(\d+(?:\.\d+)?)\s*l\b", s, flags=re.I)
-    if m:
-        return f"{m.group(1)} L"
-
-    # 8-Piece / 8 pc / 8 pieces
-    m = re.search(r"\b(\d{1,3})\s*-\s*piece\b", s, flags=re.I)
-    if m:
-        return f"{m.group(1)}-Piece"
-
-    m = re.search(r"\b(\d{1,3})\s*pc\b", s, flags=re.I)
-    if m:
-        return f"{m.group(1)} pc"
-
-    m = re.search(r"\b(\d{1,3})\s*pieces\b", s, flags=re.I)
-    if m:
-        return f"{m.group(1)}-Piece"
-
-    return ""
+    if best is None:
+        return ""
+    return SIZE_FORMATS[best.lastgroup].format(best.group(best.lastgroup))
 
 
 def parse_size_from_code(code: str, v_name: str, p_name: str) -> str:
@@ -233,7 +313,7 @@ def parse_size_from_code(code: str, v_name: str, p_name: str) -> str:
     code = str(code)
 
     # 12SOMETHING -> 12"
-    m = re.match(r"^(\d{1,2})(?=[A-Z])", code)
+    m = CODE_LEAD_INCH_RX.match(code)
     if m:
         n = int(m.group(1))
         if 6 <= n <= 20 and (
@@ -244,27 +324,27 @@ def parse_size_from_code(code: str, v_name: str, p_name: str) -> str:
             return f'{n}"'
 
     # B8PC..., 12PC...
-    m = re.search(r"(\d{1,3})PC", code, flags=re.I)
+    m = CODE_PC_RX.search(code)
     if m:
         return f"{m.group(1)} pc"
 
     if PIECEY_NAME_RX.search(v_name) or PIECEY_NAME_RX.search(p_name):
         # 6MARBRWNE, 8BRDSTIX
-        m = re.match(r"^(\d{1,3})", code)
+        m = CODE_LEAD_NUM_RX.match(code)
         if m:
             return f"{m.group(1)} pc"
         # CINNASTIX8
-        m = re.search(r"(\d{1,3})$", code)
+        m = CODE_TRAIL_NUM_RX.search(code)
         if m:
             return f"{m.group(1)} pc"
 
     if BEV_NAME_RX.search(v_name) or BEV_NAME_RX.search(p_name):
         # 500COKE
-        m = re.match(r"^(\d{3,4})", code)
+        m = CODE_LEAD_ML_RX.match(code)
         if m:
             return f"{m.group(1)} mL"
         # 2LCOKE
-        m = re.match(r"^(\d+(?:\.\d+)?)L", code, flags=re.I)
+        m = CODE_LEAD_LITRE_RX.match(code)
         if m:
             return f"{m.group(1)} L"
 
@@ -274,9 +354,9 @@ def parse_size_from_code(code: str, v_name: str, p_name: str) -> str:
 def fallback_size_from_keywords(name: str) -> str:
     if not name:
         return ""
-    if re.search(r"\bcup\b", name, flags=re.I):
+    if CUP_RX.search(name):
         return "Cup"
-    if re.search(r"\bbag\b", name, flags=re.I):
+    if BAG_RX.search(name):
         return "Bag"
     return ""
 
@@ -316,17 +396,28 @@ def collect_category_index(menu: dict) -> Tuple[Dict[str, set], Dict[str, set]]:
     code_to_cat_names: Dict[str, set] = {}
     code_to_cat_codes: Dict[str, set] = {}
 
+    # the same few category names/codes repeat across hundreds of products
+    tidy_cache: Dict[str, str] = {}
+
+    def tidy_once(raw: Any) -> str:
+        if not isinstance(raw, str):
+            return tidy(raw)
+        t = tidy_cache.get(raw)
+        if t is None:
+            t = tidy_cache[raw] = tidy(raw)
+        return t
+
     def add_map(code: str, cname: str, ccode: str) -> None:
         if not code:
             return
-        code_to_cat_names.setdefault(code, set()).add(tidy(cname))
-        code_to_cat_codes.setdefault(code, set()).add(tidy(ccode))
+        code_to_cat_names.setdefault(code, set()).add(cname)
+        code_to_cat_codes.setdefault(code, set()).add(ccode)
 
     def walk_category(cat: dict) -> None:
         if not isinstance(cat, dict):
             return
-        cname = tidy(cat.get("Name", ""))
-        ccode = tidy(cat.get("Code", "") or cat.get("Id", "") or "")
+        cname = tidy_once(cat.get("Name", ""))
+        ccode = tidy_once(cat.get("Code", "") or cat.get("Id", "") or "")
 
         for key in (
             "Products",
@@ -364,34 +455,6 @@ def collect_products_and_variants(
     variants_by_code: Dict[str, dict] = {}
     product_to_variants: Dict[str, List[str]] = {}
 
-    if isinstance(menu.get("Products"), dict):
-        for pcode, prod in menu["Products"].items():
-            if isinstance(prod, dict):
-                products_by_code[str(pcode)] = prod
-
-    PRODUCT_HINT_KEYS = {
-        "AvailableToppings",
-        "DefaultToppings",
-        "ProductType",
-        "DefaultSides",
-        "Variants",
-    }
-    VARIANT_HINT_KEYS = {
-        "Price",
-        "PriceInfo",
-        "Size",
-        "Crust",
-        "VariantCode",
-        "VariantName",
-        "CrustName",
-        "SizeName",
-        "BreadType",
-        "Portion",
-        "PortionName",
-        "Flavor",
-        "FlavorCode",
-    }
-
     def add_variant(vcode: Optional[str], v: dict, pcode: Optional[str]) -> None:
         if not pcode:
             return
@@ -407,79 +470,45 @@ def collect_products_and_variants(
         variants_by_code[vcode] = v
         product_to_variants.setdefault(str(pcode), []).append(vcode)
 
-    def walk(obj: Any) -> None:
-        if isinstance(obj, dict):
-            has_product_code = "ProductCode" in obj
-            looks_like_product = (not has_product_code) and any(
-                k in obj for k in PRODUCT_HINT_KEYS
-            )
-            looks_like_variant = has_product_code and any(
-                k in obj for k in VARIANT_HINT_KEYS
-            )
-
-            if looks_like_product:
-                pcode = obj.get("Code") or obj.get("Id") or obj.get("ID")
-                if pcode:
-                    pcode = str(pcode)
-                    if pcode not in products_by_code:
-                        products_by_code[pcode] = obj
-                    else:
-                        # fill in any missing fields from this occurrence
-                        for k, v in obj.items():
-                            if products_by_code[pcode].get(k) in (None, ""):
-                                products_by_code[pcode][k] = v
-
-            if looks_like_variant:
+    # Products live under menu["Products"]; some menus also inline full
+    # variant dicts under a product's own "Variants" (usually just codes).
+    products = menu.get("Products")
+    if isinstance(products, dict):
+        for pcode, prod in products.items():
+            if not isinstance(prod, dict):
+                continue
+            pcode = str(pcode)
+            products_by_code[pcode] = prod
+
+            inline = prod.get("Variants")
+            if isinstance(inline, list):
+                for v in inline:
+                    if isinstance(v, dict):
+                        add_variant(
+                            v.get("Code") or v.get("VariantCode"),
+                            v,
+                            v.get("ProductCode") or pcode,
+                        )
+            elif isinstance(inline, dict):
+                for vc, v in inline.items():
+                    if isinstance(v, dict):
+                        add_variant(vc, v, v.get("ProductCode") or pcode)
+
+    # Variants live under menu["Variants"], bound to products by ProductCode
+    variants = menu.get("Variants")
+    if isinstance(variants, dict):
+        for vc, v in variants.items():
+            if isinstance(v, dict):
                 add_variant(
-                    obj.get("Code") or obj.get("VariantCode"),
-                    obj,
-                    obj.get("ProductCode"),
+                    v.get("Code") or v.get("VariantCode") or vc,
+                    v,
+                    v.get("ProductCode"),
                 )
 
-            if "Variants" in obj and isinstance(
-                obj["Variants"], (list, dict)
-            ):
-                pcode_inline = (
-                    obj.get("Code")
-                    or obj.get("Id")
-                    or obj.get("ID")
-                    or obj.get("ProductCode")
-                )
-                if isinstance(obj["Variants"], list):
-                    for v in obj["Variants"]:
-                        if isinstance(v, dict):
-                            add_variant(
-                                v.get("Code") or v.get("VariantCode"),
-                                v,
-                                v.get("ProductCode") or pcode_inline,
-                            )
-                else:
-                    for vc, v in obj["Variants"].items():
-                        if isinstance(v, dict):
-                            add_variant(
-                                vc,
-                                v,
-                                v.get("ProductCode") or pcode_inline,
-                            )
-
-            for _, v in obj.items():
-                walk(v)
-
-        elif isinstance(obj, list):
-            for el in obj:
-                walk(el)
-
-    walk(menu)
-
-    # de-dupe per product
-    for p, lst in list(product_to_variants.items()):
-        seen: set[str] = set()
-        uniq: List[str] = []
-        for vc in lst:
-            if vc not in seen:
-                uniq.append(vc)
-                seen.add(vc)
-        product_to_variants[p] = uniq
+    # de-dupe per product (a variant can be listed inline and top-level);
+    # dict.fromkeys keeps first-seen order
+    for p, lst in product_to_variants.items():
+        product_to_variants[p] = list(dict.fromkeys(lst))
 
     return products_by_code, variants_by_code, product_to_variants
 
@@ -530,6 +559,10 @@ WORK_COLS = [
     "portion",
     "price",
 ]
+# positions used by scrape_store's keep rule
+PRODUCT_NAME_IDX = WORK_COLS.index("product_name")
+VARIANT_NAME_IDX = WORK_COLS.index("variant_name")
+PRICE_IDX = WORK_COLS.index("price")
 
 
 def collect_category_strings(
@@ -549,20 +582,72 @@ def collect_category_strings(
     )
 
 
-def scrape_store(store_id: int) -> List[dict]:
+def fetch_menu(store_id: int) -> Any:
+    return json_loads(
+        SESSION.get(
+            f"{BASE_URL}/store/{store_id}/menu?lang=en&structured=true",
+            timeout=TIMEOUT,
+        ).content
+    )
+
+
+def is_profile(obj: Any) -> bool:
+    """True for a store profile we can use (dict with a city or province)."""
+    if not isinstance(obj, dict):
+        return False
+    flat = flatten(obj)
+    return bool(extract_city(flat) or extract_province(flat))
+
+
+def fetch_profile(store_id: int) -> Any:
+    """Return the store profile, from the disk cache when still fresh."""
+    cache_file = PROFILE_CACHE_DIR / f"{store_id}.json"
+    try:
+        if time.time() - cache_file.stat().st_mtime < PROFILE_CACHE_TTL:
+            cached = json_loads(cache_file.read_bytes())
+            if is_profile(cached):
+                return cached
+    except (OSError, ValueError):
+        pass  # missing, unreadable or corrupt -> refetch
+
+    r = SESSION.get(
+        f"{BASE_URL}/store/{store_id}/profile",
+        timeout=TIMEOUT,
+    )
+    profile = json_loads(r.content)
+    # only cache real profiles: an error envelope would stick for the TTL
+    if r.ok and is_profile(profile):
+        # write-then-rename, so a killed run never leaves a partial file
+        tmp = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(profile), encoding="utf-8")
+        os.replace(tmp, cache_file)
+    return profile
+
+
+def empty_columns() -> List[list]:
+    return [[] for _ in WORK_COLS]
+
+
+def scrape_store(
+    store_id: int,
+    profile_ex: Optional[concurrent.futures.Executor] = None,
+) -> List[list]:
     """
-    Scrape a single Domino's store and return a list of work-rows.
+    Scrape a single Domino's store and return its pizza work-rows
+    column-wise: one list per WORK_COLS entry, in the same order.
+
+    With `profile_ex`, the profile is fetched there while this worker pulls
+    the menu (must not be the pool running scrape_store itself).
     """
     try:
-        menu = requests.get(
-            f"{BASE_URL}/store/{store_id}/menu?lang=en&structured=true",
-            timeout=TIMEOUT,
-        ).json()
-        profile = requests.get(
-            f"{BASE_URL}/store/{store_id}/profile",
-            timeout=TIMEOUT,
-        ).json()
-        flat = pd.json_normalize(profile, sep="_").iloc[0].to_dict()
+        if profile_ex is not None:
+            profile_fut = profile_ex.submit(fetch_profile, store_id)
+            menu = fetch_menu(store_id)
+            profile = profile_fut.result()
+        else:
+            menu = fetch_menu(store_id)
+            profile = fetch_profile(store_id)
+        flat = flatten(profile)
 
         province = extract_province(flat)
         city = extract_city(flat)
@@ -573,14 +658,26 @@ def scrape_store(store_id: int) -> List[dict]:
         )
         code_to_cat_names, code_to_cat_codes = collect_category_index(menu)
 
-        rows: List[dict] = []
-        prod_codes = set(products_by_code.keys()) | {
-            str(v.get("ProductCode"))
-            for v in variants_by_code.values()
-            if v.get("ProductCode")
-        }
+        cols = empty_columns()
+        store_key = f"DP_{store_id}"  # pipeline-wide prefix
 
-        for pcode in sorted(prod_codes):
+        def emit(*values: Any) -> None:
+            # values are positional in WORK_COLS order; basic keep rule:
+            # product_name, variant_name or a price must be present
+            if (
+                values[PRODUCT_NAME_IDX]
+                or values[VARIANT_NAME_IDX]
+                or values[PRICE_IDX] != ""
+            ):
+                for col, val in zip(cols, values):
+                    col.append(val)
+
+        # Products in menu order, then codes known only through variants
+        orphan_codes = [
+            pc for pc in product_to_variants if pc not in products_by_code
+        ]
+
+        for pcode in [*products_by_code, *orphan_codes]:
             prod = products_by_code.get(pcode, {})
             p_name = tidy(prod.get("Name") or prod.get("ProductName") or "")
             p_desc = tidy(prod.get("Description") or "")
@@ -589,47 +686,52 @@ def scrape_store(store_id: int) -> List[dict]:
                 pcode, v_codes, code_to_cat_names, code_to_cat_codes
             )
 
+            # Pizza-only: skip anything not filed under a pizza category
+            if "pizza" not in cat_names_str.lower():
+                continue
+
+            # Product-level fallbacks, shared by every variant below
+            p_crust = tidy(
+                prod.get("Crust")
+                or prod.get("CrustName")
+                or prod.get("BreadType")
+                or ""
+            )
+            p_name_crust = parse_crust_from_name(p_name)
+
             # No-variant products
             if not v_codes:
                 price = price_of(prod)
                 size = derive_size({}, prod, "", p_name, "")
-                crust = (
-                    tidy(
-                        prod.get("Crust")
-                        or prod.get("CrustName")
-                        or prod.get("BreadType")
-                        or ""
-                    )
-                    or parse_crust_from_name(p_name)
-                )
+                crust = p_crust or p_name_crust
                 flavor = tidy(
                     prod.get("Flavor")
                     or prod.get("FlavorName")
                     or prod.get("FlavorCode")
                     or ""
                 )
-                rows.append(
-                    {
-                        "store_id": store_id,
-                        "store_name": store_name,
-                        "city": city,
-                        "province": province,
-                        "category_names": cat_names_str,
-                        "category_codes": cat_codes_str,
-                        "product_code": pcode,
-                        "product_name": p_name,
-                        "product_desc": p_desc,
-                        "variant_code": "",
-                        "variant_name": "",
-                        "size": size,
-                        "crust": crust,
-                        "flavor": flavor,
-                        "portion": tidy(prod.get("Portion") or ""),
-                        "price": price if price != "" else "",
-                    }
+                emit(
+                    store_key,
+                    store_name,
+                    city,
+                    province,
+                    "Pizza",  # category_names, normalized
+                    cat_codes_str,
+                    pcode,
+                    p_name,
+                    p_desc,
+                    "",  # variant_code
+                    "",  # variant_name
+                    size,
+                    crust,
+                    flavor,
+                    tidy(prod.get("Portion") or ""),
+                    price,
                 )
                 continue
 
+            p_flavor = tidy(prod.get("Flavor") or "")
+
             # Products with variants
             for vcode in v_codes:
                 v = variants_by_code.get(vcode, {}) if vcode else {}
@@ -646,68 +748,49 @@ def scrape_store(store_id: int) -> List[dict]:
                 )
                 if not crust:
                     crust = (
-                        tidy(
-                            prod.get("Crust")
-                            or prod.get("CrustName")
-                            or prod.get("BreadType")
-                            or ""
-                        )
+                        p_crust
                         or parse_crust_from_name(v_name)
-                        or parse_crust_from_name(p_name)
+                        or p_name_crust
                     )
                 portion = tidy(
                     v.get("Portion")
                     or v.get("PortionName")
                     or ""
                 )
-                flavor = tidy(
+                v_flavor = (
                     v.get("Flavor")
                     or v.get("FlavorName")
                     or v.get("FlavorCode")
-                    or prod.get("Flavor")
-                    or ""
                 )
+                flavor = tidy(v_flavor) if v_flavor else p_flavor
                 price = price_of(v) if v else ""
                 if price == "":
                     price = price_of(prod)
 
-                rows.append(
-                    {
-                        "store_id": store_id,
-                        "store_name": store_name,
-                        "city": city,
-                        "province": province,
-                        "category_names": cat_names_str,
-                        "category_codes": cat_codes_str,
-                        "product_code": pcode,
-                        "product_name": p_name,
-                        "product_desc": p_desc,
-                        "variant_code": vcode,
-                        "variant_name": v_name,
-                        "size": size,
-                        "crust": crust,
-                        "flavor": flavor,
-                        "portion": portion,
-                        "price": price,
-                    }
+                emit(
+                    store_key,
+                    store_name,
+                    city,
+                    province,
+                    "Pizza",  # category_names, normalized
+                    cat_codes_str,
+                    pcode,
+                    p_name,
+                    p_desc,
+                    f"DP_{vcode}" if vcode else "",
+                    v_name,
+                    size,
+                    crust,
+                    flavor,
+                    portion,
+                    price,
                 )
 
-        # basic keep rule
-        cleaned: List[dict] = []
-        for r in rows:
-            if any(
-                [
-                    r.get("product_name"),
-                    r.get("variant_name"),
-                    r.get("price") not in ("", None),
-                ]
-            ):
-                cleaned.append({k: r.get(k, "") for k in WORK_COLS})
-        return cleaned
+        return cols
 
     except Exception as e:  # pragma: no cover - defensive logging
         sys.stderr.write(f"[store {store_id}] error: {e}\n")
-        return []
+        return empty_columns()
 
 
 # -------------------- main orchestration --------------------
@@ -719,30 +802,30 @@ def main() -> None:
     out_file = OUTPUT_DIR / f"menu_dominos_ca_menu_{today_tag}.csv"
 
     print("Fetching Domino's store list …")
-    html_txt = requests.get(STORES_URL, timeout=TIMEOUT).text
-    store_ids = sorted(set(map(int, re.findall(r"\(#(\d{4,5})\)", html_txt))))
+    html_txt = SESSION.get(STORES_URL, timeout=TIMEOUT).text
+    store_ids = sorted({int(m.group(1)) for m in STORE_ID_RX.finditer(html_txt)})
     print(f"→ {len(store_ids):,} stores\n")
 
-    all_rows: List[dict] = []
+    all_cols = empty_columns()
+    # Side pool for profile requests, so a store worker can fetch its menu
+    # while the profile is in flight (kept separate from the store pool to
+    # avoid workers blocking on tasks queued behind themselves).
     with concurrent.futures.ThreadPoolExecutor(
+        MAX_WORKERS, thread_name_prefix="profile"
+    ) as profile_ex, concurrent.futures.ThreadPoolExecutor(
         MAX_WORKERS
     ) as executor:
         for batch in tqdm(
-            executor.map(scrape_store, store_ids),
+            executor.map(
+                lambda sid: scrape_store(sid, profile_ex), store_ids
+            ),
             total=len(store_ids),
             unit="store",
         ):
-            all_rows.extend(batch)
+            for col, part in zip(all_cols, batch):
+                col.extend(part)
 
-    df = pd.DataFrame(all_rows)
-
-    # ---- Pizza-only filter + normalize category ----
-    if not df.empty:
-        mask = df["category_names"].str.contains(
-            "pizza", case=False, na=False
-        )
-        df = df.loc[mask].copy()
-        df.loc[:, "category_names"] = "Pizza"
+    df = pd.DataFrame(dict(zip(WORK_COLS, all_cols)))
 
     # ---- Keep only requested columns and rename ----
     df = df[
@@ -767,26 +850,16 @@ def main() -> None:
         }
     )
 
-    # ---- Recipe exact "Pizza" -> "CYO" ----
-    if not df.empty:
-        mask_exact_pizza = df["recipe"].fillna("").str.strip().eq("Pizza")
-        df.loc[mask_exact_pizza, "recipe"] = "CYO"
+    # ---- Recipe exact "Pizza" -> "CYO" (names are already tidied) ----
+    df["recipe"] = df["recipe"].mask(df["recipe"].eq("Pizza"), "CYO")
 
     # ---- Add date facts ----
     df["date_key"] = today.strftime("%Y-%m-%d")
     df["month"] = today.strftime("%B")  # use "%m" for 01-12 if preferred
     df["year"] = today.strftime("%Y")
 
-    # ---- Add chain_key + prefixes ----
+    # ---- Add chain_key (store/product keys are prefixed at scrape time) ----
     df["chain_key"] = CHAIN_KEY
-    df["store_key"] = "DP_" + df["store_key"].astype(str)
-
-    non_empty_pk = df["product_key"].notna() & (
-        df["product_key"].astype(str).str.len() > 0
-    )
-    df.loc[non_empty_pk, "product_key"] = (
-        "DP_" + df.loc[non_empty_pk, "product_key"].astype(str)
-    )
 
     # ---- Final column order ----
     df = df[
@@ -807,7 +880,11 @@ def main() -> None:
         ]
     ]
 
-    df.to_csv(out_file, index=False, encoding="utf-8-sig")
+    # csv.writer over plain column lists: C-level rows, no per-cell formatting
+    with out_file.open("w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(df.columns)
+        writer.writerows(zip(*(df[c].tolist() for c in df.columns)))
 
     print("✓ Domino's menu (pizza only) written →", out_file)
     if not df.empty:
@@ -5,8 +5,8 @@ Pizza Hut Canada – Pizza-Only Scraper (Pricing Pipeline Compatible)
 Purpose
 -------
 Scrape Pizza Hut Canada store data and pizza menu prices for all huts,
-and export an analytics-ready CSV compatible with the broader pricing
-pipeline schema:
+and export an analytics-ready file (Parquet, or CSV with --csv) compatible
+with the broader pricing pipeline schema:
 
     chain_key, store_key, city, province, category,
     recipe, product_key, size, crust, price,
@@ -14,40 +14,52 @@ pipeline schema:
 
 The script:
 - Retrieves all Canadian huts (stores) from the public Pizza Hut API.
-- Fetches pizza products and variants per hut with simple throttling.
+- Fetches pizza products and variants per hut, pacing requests with a
+  shared AIMD rate limiter and backing off when throttled.
 - Normalizes size, crust, recipe, and price into a clean, consistent format.
-- Emits a single CSV suitable for downstream modelling (e.g., DuckDB + Power BI).
+- Emits a single ZSTD Parquet (or CSV) file suitable for downstream
+  modelling (e.g., DuckDB + Power BI).
 
 Usage
 -----
-    python pizza_hut_scraper.py
+    python pizza_hut_scraper.py          # Parquet
+    python pizza_hut_scraper.py --csv    # CSV
 
 Output
 ------
-A CSV file in the local `data/raw/` folder:
+One file in the local `data/raw/` folder:
 
-    data/raw/pizzahut_pizza_<YYYYMMDD>.csv
+    data/raw/pizzahut_pizza_<YYYYMMDD>.parquet   (default)
+    data/raw/pizzahut_pizza_<YYYYMMDD>.csv       (--csv, or no pyarrow)
 
 Dependencies
 ------------
 - requests
 - urllib3
 - tqdm
+- orjson (optional; faster JSON parsing, falls back to `json`)
+- pyarrow (optional; Parquet output, falls back to CSV)
 """
 
 from __future__ import annotations
 
+import argparse
 import csv
+import ctypes
 import json
 import logging
 import os
+import queue
+import random
 import re
 import sys
 import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Tuple
 
@@ -56,20 +68,49 @@ import urllib3
 from requests.adapters import HTTPAdapter, Retry
 from tqdm import tqdm
 
-# allow large fields in CSV
-csv.field_size_limit(sys.maxsize)
+# orjson decodes the per-hut product payloads straight from bytes; stdlib fallback
+try:  # pragma: no cover - optional dependency
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover
+    from json import loads as json_loads
+
+# pyarrow enables the default Parquet output; without it we write CSV
+try:  # pragma: no cover - optional dependency
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = pq = None
+
+# allow large fields in CSV. The limit is a C long, which is 32-bit on
+# Windows, so sys.maxsize overflows there: start at the platform's max long
+# and step down until it is accepted.
+_field_limit = ctypes.c_ulong(-1).value // 2
+while True:
+    try:
+        csv.field_size_limit(_field_limit)
+        break
+    except OverflowError:
+        _field_limit //= 10
 
 # ── paths & runtime config ────────────────────────────────────────
 
-DATE_STR = datetime.today().strftime("%Y%m%d")
+# run-date constants (one run = one snapshot date)
+_TODAY = datetime.today()
+DATE_STR = _TODAY.strftime("%Y%m%d")
+DATE_KEY = _TODAY.strftime("%Y-%m-%d")
+MONTH = _TODAY.strftime("%B")
+YEAR = str(_TODAY.year)
 
 # Portfolio-friendly: relative output folder inside the repo
 OUTPUT_DIR = Path("data/raw")
 OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 OUT_FILE = OUTPUT_DIR / f"pizzahut_pizza_{DATE_STR}.csv"
+OUT_FILE_PARQUET = OUT_FILE.with_suffix(".parquet")
 
-COOLDOWN_SECS = 15
+MAX_WORKERS = 32
+COOLDOWN_SECS = 15  # backoff base between throttled blast waves
+BACKOFF_CAP_SECS = 60.0
 CONNECT_TO, READ_TO = 3, 15
 CHAIN_KEY = "PH"  # constant chain identifier (Pizza Hut)
 
@@ -94,66 +135,203 @@ logging.basicConfig(
 
 STOP_FLAG = threading.Event()
 
-# ── zero-retry HTTP session (per-thread) ─────────────────────────
+# ── client-side rate limiting (AIMD token bucket) ────────────────
+
+RATE_INITIAL = 16.0  # requests / second, shared by all workers
+RATE_MIN, RATE_MAX = 1.0, 32.0
+RATE_INCREASE = 0.5  # additive step …
+RATE_INCREASE_EVERY = 20  # … per this many consecutive successes
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket whose refill rate follows AIMD.
+
+    `acquire()` blocks until a token is available. `on_throttle()` halves the
+    rate (at most once per second, so a burst of concurrent 429s counts as one
+    signal); `on_success()` adds RATE_INCREASE after every
+    RATE_INCREASE_EVERY consecutive successes, up to `rate_max`.
+    """
+
+    def __init__(
+        self,
+        rate: float = RATE_INITIAL,
+        rate_min: float = RATE_MIN,
+        rate_max: float = RATE_MAX,
+    ) -> None:
+        self.rate = rate
+        self.rate_min = rate_min
+        self.rate_max = rate_max
+        self.tokens = 1.0
+        self.last_refill = time.monotonic()
+        self._last_cut = 0.0
+        self._successes = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                burst = max(1.0, self.rate)
+                self.tokens = min(
+                    burst, self.tokens + (now - self.last_refill) * self.rate
+                )
+                self.last_refill = now
+                if self.tokens >= 1.0:
+                    self.tokens -= 1.0
+                    return
+                delay = (1.0 - self.tokens) / self.rate
+            time.sleep(delay)
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            self._successes = 0
+            now = time.monotonic()
+            if now - self._last_cut < 1.0:
+                return
+            self._last_cut = now
+            self.rate = max(self.rate_min, self.rate * 0.5)
+            self.tokens = 0.0
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._successes += 1
+            if self._successes >= RATE_INCREASE_EVERY:
+                self._successes = 0
+                self.rate = min(self.rate_max, self.rate + RATE_INCREASE)
+
+
+LIMITER = RateLimiter()
+
+# ── zero-retry HTTP session (shared) ──────────────────────────────
 
 retry_cfg = Retry(total=0)
-thread_local = threading.local()
+
+# One Session for every worker: requests.Session is safe for concurrent GETs,
+# and a single pool lets all threads reuse the same keep-alive TLS sockets.
+SESSION = requests.Session()
+SESSION.headers.update(
+    {
+        "User-Agent": "Mozilla/5.0 (compatible; PizzaPricingScraper/1.0)",
+        "Accept": "application/json",
+        "Accept-Language": "en-CA,en;q=0.9",
+    }
+)
+SESSION.mount(
+    "https://",
+    HTTPAdapter(pool_connections=4, pool_maxsize=64, max_retries=retry_cfg),
+)
 
 
 def get_sess() -> requests.Session:
-    """Return a thread-local Session with basic headers and no retries."""
-    if not hasattr(thread_local, "sess"):
-        s = requests.Session()
-        s.headers.update(
-            {
-                "User-Agent": "Mozilla/5.0 (compatible; PizzaPricingScraper/1.0)",
-                "Accept": "application/json",
-                "Accept-Language": "en-CA,en;q=0.9",
-            }
-        )
-        s.mount("https://", HTTPAdapter(max_retries=retry_cfg))
-        thread_local.sess = s
-    return thread_local.sess
+    """Return the shared Session (basic headers, no retries)."""
+    return SESSION
+
+
+# Per-endpoint template requests: headers/defaults merged once, plus the
+# environment settings (proxies, CA bundle) that Session.request would
+# otherwise recompute on every call.
+_PREPARED: Dict[str, Tuple[requests.PreparedRequest, Dict[str, Any]]] = {}
+
+
+def _prepared_get(
+    url: str, params: Dict[str, Any] | None
+) -> Tuple[requests.PreparedRequest, Dict[str, Any]]:
+    """Return a ready-to-send GET for `url` + `params` and its send kwargs."""
+    cached = _PREPARED.get(url)
+    if cached is None:
+        sess = get_sess()
+        base = sess.prepare_request(requests.Request("GET", url))
+        env = sess.merge_environment_settings(url, {}, None, None, None)
+        cached = _PREPARED.setdefault(url, (base, env))
+    base, env = cached
+    prep = base.copy()
+    prep.prepare_url(url, params)
+    # pick up any cookies the API has set since the template was built
+    prep.headers.pop("Cookie", None)
+    prep.prepare_cookies(get_sess().cookies)
+    return prep, env
 
 
 class Throttled(Exception):
     """
     Raised when the API asks us to slow down (429/403) or drops the connection.
 
-    Used to coordinate "blast" cycles with a cooldown period.
+    Used to coordinate "blast" cycles with a cooldown period. `retry_after`
+    carries the server's Retry-After hint in seconds, when it sent one.
     """
 
+    def __init__(self, retry_after: float | None = None) -> None:
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+
+def backoff_delay(
+    attempt: int, base: float = 1.0, cap: float = BACKOFF_CAP_SECS
+) -> float:
+    """Exponential backoff with full jitter: uniform in [0, min(cap, base·2^n))."""
+    return random.random() * min(cap, base * (2**attempt))
+
+
+def _retry_after_secs(r: requests.Response) -> float | None:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    val = r.headers.get("Retry-After")
+    if not val:
+        return None
+    try:
+        return max(0.0, float(val))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(val)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
 
 def fetch_json(url: str, params: Dict[str, Any] | None = None) -> Any:
     """
-    Return parsed JSON or None.
+    Return parsed JSON, or None for empty/undecodable bodies and any
+    non-2xx status other than the throttle codes.
 
     Raises Throttled if the API signals we should slow down (429/403) or a
     connection error occurs while blasting.
     """
     if STOP_FLAG.is_set():
         raise Throttled
+    LIMITER.acquire()
+    if STOP_FLAG.is_set():  # another worker was throttled while we waited
+        raise Throttled
 
     try:
-        r = get_sess().get(url, params=params, timeout=(CONNECT_TO, READ_TO))
+        prep, send_kw = _prepared_get(url, params)
+        r = get_sess().send(prep, timeout=(CONNECT_TO, READ_TO), **send_kw)
     except requests.exceptions.ConnectionError:
+        LIMITER.on_throttle()
         STOP_FLAG.set()
         raise Throttled
     except (requests.exceptions.RetryError, urllib3.exceptions.MaxRetryError) as e:
         logging.warning("RetryError on %s – %s", url, e)
         return None
 
-    if r.status_code in (429, 403):
+    sc = r.status_code
+    if 200 <= sc < 300:
+        LIMITER.on_success()
+        body = r.content
+        if not body:
+            return None
+        try:
+            return json_loads(body)
+        except ValueError:  # orjson.JSONDecodeError subclasses ValueError too
+            return None
+    if sc in (429, 403):
+        LIMITER.on_throttle()
         STOP_FLAG.set()
-        raise Throttled
-    if r.status_code in (400, 404) or r.status_code >= 500:
-        return None
-
-    r.raise_for_status()
-    try:
-        return r.json()
-    except Exception:
-        return None
+        raise Throttled(_retry_after_secs(r))
+    # any other 4xx/5xx (or stray 3xx): no usable payload for this hut
+    return None
 
 
 # ── huts fetch with simple backoff ───────────────────────────────
@@ -171,13 +349,16 @@ def fetch_huts_with_backoff(max_attempts: int = 6) -> List[Dict[str, Any]]:
             huts = fetch_json(HUTS_URL, params)
             if isinstance(huts, list) and huts:
                 return huts
-            time.sleep(2 + attempt)
-        except Throttled:
-            print(f"[huts] Throttled – cooling down {COOLDOWN_SECS}s …")
-            time.sleep(COOLDOWN_SECS)
+            time.sleep(backoff_delay(attempt))
+        except Throttled as e:
+            delay = max(
+                e.retry_after or 0.0, backoff_delay(attempt, base=COOLDOWN_SECS)
+            )
+            print(f"[huts] Throttled – cooling down {delay:.1f}s …")
+            time.sleep(delay)
         except Exception as e:  # pragma: no cover - defensive logging
             logging.warning("Huts fetch error (attempt %s): %s", attempt, e)
-            time.sleep(2 + attempt)
+            time.sleep(backoff_delay(attempt))
 
     return []
 
@@ -186,6 +367,40 @@ def fetch_huts_with_backoff(max_attempts: int = 6) -> List[Dict[str, Any]]:
 
 _NUM_INCH = re.compile(r"(?<!\d)(8|9|10|11|12|13|14|15|16|18|20|22|24)(?!\d)")
 
+# Size words in priority order. The lookahead finds overlapping hits, so
+# "x-large" still yields "large" (which outranks "xl"), as before.
+_SIZE_BY_TOKEN = {
+    "personal": "Personal",
+    "small": "Small",
+    "medium": "Medium",
+    "large": "Large",
+    "xl": "X-Large",
+}
+_SIZE_RANK = {tok: i for i, tok in enumerate(_SIZE_BY_TOKEN)}
+_SIZE_TOKEN = re.compile(r"(?=(personal|small|medium|large|xl))")
+
+_CRUSTS_PREFIX = re.compile(r"^.*Crusts\.", re.I)
+_KEYISH_SPLIT = re.compile(r"[.\s]+")
+_TRAIL_CODE = re.compile(r"\s+[A-Z0-9]{1,3}$", re.I)
+_BBQ = re.compile(r"\bbbq\b", re.I)
+_MULTISPACE = re.compile(r"\s{2,}")
+
+_CRUST_MAP = {
+    "hand tossed": "Hand Tossed",
+    "handcrafted": "Handcrafted",
+    "original pan": "Original Pan",
+    "pan": "Pan",
+    "stuffed": "Stuffed Crust",
+    "stuffed crust": "Stuffed Crust",
+    "thin ’n’ crispy": "Thin ’n’ Crispy",
+    "thin 'n' crispy": "Thin ’n’ Crispy",
+    "thin n crispy": "Thin ’n’ Crispy",
+    "thin": "Thin ’n’ Crispy",
+    "gluten free": "Gluten Free",
+    "regular": "Regular Dough",
+    "regular dough": "Regular Dough",
+}
+
 
 def normalize_size(size_val: Any, fallback_from_text: str = "") -> str:
     """
@@ -201,25 +416,24 @@ def normalize_size(size_val: Any, fallback_from_text: str = "") -> str:
     s = (str(size_val) if size_val else "").strip().lower().replace("_", "-")
     if not s and fallback_from_text:
         s = fallback_from_text.strip().lower()
+    return _size_from_text(s)
+
 
+@lru_cache(maxsize=4096)
+def _size_from_text(s: str) -> str:
     m = _NUM_INCH.search(s)
     if m:
         return f'{m.group(1)}"'
 
-    if "personal" in s:
-        return "Personal"
-    if "small" in s:
-        return "Small"
-    if "medium" in s:
-        return "Medium"
-    if "large" in s:
-        return "Large"
-    if any(x in s for x in ("x-large", "xlarge", "xl")):
-        return "X-Large"
-
-    return "Medium"
+    best = min(
+        (m.group(1) for m in _SIZE_TOKEN.finditer(s)),
+        key=_SIZE_RANK.__getitem__,
+        default=None,
+    )
+    return _SIZE_BY_TOKEN[best] if best else "Medium"
 
 
+@lru_cache(maxsize=4096)
 def _crust_from_keyish(txt: str) -> str:
     """
     Extract crust when variant keys look like:
@@ -229,7 +443,7 @@ def _crust_from_keyish(txt: str) -> str:
     if "Crusts." in t:
         cand = t.split("Crusts.", 1)[-1]
     else:
-        parts = re.split(r"[.\s]+", t.strip())
+        parts = _KEYISH_SPLIT.split(t.strip())
         cand = parts[-1] if parts else ""
     cand = cand.replace("-", " ").strip().title()
     return cand
@@ -243,95 +457,117 @@ def normalize_crust(crust_val: Any, fallback_from_key: str = "") -> str:
         s = _crust_from_keyish(fallback_from_key)
     else:
         return "Regular Dough"
+    return _crust_from_text(s)
+
 
-    s = re.sub(r"^.*Crusts\.", "", s, flags=re.I)
+@lru_cache(maxsize=4096)
+def _crust_from_text(s: str) -> str:
+    s = _CRUSTS_PREFIX.sub("", s)
     s = s.replace(".", " ").strip()
     low = s.lower()
 
     if not low:
         return "Regular Dough"
 
-    mapping = {
-        "hand tossed": "Hand Tossed",
-        "handcrafted": "Handcrafted",
-        "original pan": "Original Pan",
-        "pan": "Pan",
-        "stuffed": "Stuffed Crust",
-        "stuffed crust": "Stuffed Crust",
-        "thin ’n’ crispy": "Thin ’n’ Crispy",
-        "thin 'n' crispy": "Thin ’n’ Crispy",
-        "thin n crispy": "Thin ’n’ Crispy",
-        "thin": "Thin ’n’ Crispy",
-        "gluten free": "Gluten Free",
-        "regular": "Regular Dough",
-        "regular dough": "Regular Dough",
-    }
-    return mapping.get(low, s.title())
+    return _CRUST_MAP.get(low) or s.title()  # title() only on a miss
 
 
 def clean_recipe(name: str) -> str:
     """Clean recipe / pizza name for consistent grouping."""
     if not name:
         return ""
-    s = str(name).strip()
+    return _clean_recipe_text(str(name))
+
+
+@lru_cache(maxsize=4096)
+def _clean_recipe_text(s: str) -> str:
+    s = s.strip()
     # Remove trailing short alphanumeric codes like "2X", "2J", "28", "25"
-    s = re.sub(r"\s+[A-Z0-9]{1,3}$", "", s, flags=re.I)
+    s = _TRAIL_CODE.sub("", s)
     # Normalize BBQ casing
-    s = re.sub(r"\bbbq\b", "BBQ", s, flags=re.I)
-    s = re.sub(r"\s{2,}", " ", s).strip()
+    s = _BBQ.sub("BBQ", s)
+    s = _MULTISPACE.sub(" ", s).strip()
     return s
 
 
 def cents_to_dollars(v: Any) -> float | None:
     try:
-        iv = int(v)
-        return round(iv / 100.0, 2)
+        # int / 100 is already the nearest double to the 2-dp value, so a
+        # round(…, 2) here would be a no-op
+        return int(v) / 100.0
     except Exception:
         return None
 
 
-def price_from_variant(v: Dict[str, Any], prod: Dict[str, Any] | None = None) -> Any:
-    """
-    Best-effort price extraction from a variant, with product-level fallback.
-    """
-    cand = v.get("price")
-    if isinstance(cand, (int, float)):
-        return round(float(cand), 2)
-
-    if isinstance(cand, dict):
-        for key in ("amount", "value", "price"):
-            if key in cand and isinstance(cand[key], (int, float)):
-                return round(float(cand[key]), 2)
-        if "cents" in cand:
-            got = cents_to_dollars(cand["cents"])
-            if got is not None:
-                return got
-
-    for key in ("unitPrice", "value", "amount"):
-        if isinstance(v.get(key), (int, float)):
-            return round(float(v[key]), 2)
-
-    if "priceCents" in v:
-        got = cents_to_dollars(v["priceCents"])
+# Price sources in precedence order, as (key, kind):
+#   "num"       – a plain number in dollars
+#   "nested"    – a dict ({"amount": …} / {"cents": …}), walked with _NESTED_PRICE
+#   "cents"     – anything int() accepts, in cents
+#   "int_cents" – an int, in cents
+_VARIANT_PRICE = (
+    ("price", "nested"),
+    ("unitPrice", "num"),
+    ("value", "num"),
+    ("amount", "num"),
+    ("priceCents", "cents"),
+)
+_NESTED_PRICE = (
+    ("amount", "num"),
+    ("value", "num"),
+    ("price", "num"),
+    ("cents", "cents"),
+)
+_PRODUCT_PRICE = (
+    ("price", "num"),
+    ("priceCents", "int_cents"),
+)
+
+
+def _walk_price(
+    obj: Dict[str, Any], sources: Tuple[Tuple[str, str], ...]
+) -> float | None:
+    """Return the first usable price from `obj` per `sources`, else None."""
+    for key, kind in sources:
+        val = obj.get(key)
+        if val is None:
+            continue
+        if kind == "cents":
+            got = cents_to_dollars(val)
+        elif kind == "int_cents":
+            got = cents_to_dollars(val) if isinstance(val, int) else None
+        elif isinstance(val, float):
+            got = round(val, 2)
+        elif isinstance(val, int):  # whole dollars: nothing to round
+            got = float(val)
+        elif kind == "nested" and isinstance(val, dict):
+            got = _walk_price(val, _NESTED_PRICE)
+        else:
+            continue
         if got is not None:
             return got
+    return None
 
-    if prod:
-        if isinstance(prod.get("price"), (int, float)):
-            return round(float(prod["price"]), 2)
-        if "priceCents" in prod and isinstance(prod["priceCents"], int):
-            got = cents_to_dollars(prod["priceCents"])
-            if got is not None:
-                return got
 
-    return ""
+def price_from_variant(v: Dict[str, Any], prod: Dict[str, Any] | None = None) -> Any:
+    """
+    Best-effort price extraction from a variant, with product-level fallback.
+    """
+    got = _walk_price(v, _VARIANT_PRICE)
+    if got is None and prod:
+        got = _walk_price(prod, _PRODUCT_PRICE)
+    return "" if got is None else got
 
 
 # --- product_key helpers (underscores only, no store in key) -----
 
+# One pass both replaces and collapses: "_" is itself outside [a-z0-9], so a
+# run like "-_ ." becomes a single "_" and no separate "_+" pass is needed.
 _SLUG_BAD_FOR_KEY = re.compile(r"[^a-z0-9]+")
+_PIZZA_PREFIX = re.compile(r"^pizza\.")
+_SHORT_CODE_TAIL = re.compile(r"[-._][a-z0-9]{1,3}$")
 
 
+@lru_cache(maxsize=4096)
 def key_slug_from_recipe(recipe: str, prod_id_like: str = "") -> str:
     """
     Build a compact base key from the cleaned recipe (preferred).
@@ -341,20 +577,19 @@ def key_slug_from_recipe(recipe: str, prod_id_like: str = "") -> str:
     """
     base = (recipe or "").strip().lower()
     base = _SLUG_BAD_FOR_KEY.sub("_", base).strip("_")
-    base = re.sub(r"_+", "_", base)
     if base:
         return base[:40]
 
     raw = (prod_id_like or "").lower()
     raw = raw.replace("pizza,", "pizza.").replace("pizza..", "pizza.")
-    raw = re.sub(r"^pizza\.", "", raw)          # drop leading pizza.
+    raw = _PIZZA_PREFIX.sub("", raw)            # drop leading pizza.
     raw = raw.split(".", 1)[0]                  # drop .12-medium-... tail
-    raw = re.sub(r"[-._][a-z0-9]{1,3}$", "", raw)  # drop short code suffix
+    raw = _SHORT_CODE_TAIL.sub("", raw)         # drop short code suffix
     raw = _SLUG_BAD_FOR_KEY.sub("_", raw).strip("_")
-    raw = re.sub(r"_+", "_", raw)
     return (raw or "recipe")[:40]
 
 
+@lru_cache(maxsize=4096)
 def abbrev_size_token(size: str) -> str:
     if not size:
         return "m"
@@ -372,6 +607,7 @@ def abbrev_size_token(size: str) -> str:
     return mapping.get(s, re.sub(r"[^A-Z0-9]", "", s).lower()[:6] or "m")
 
 
+@lru_cache(maxsize=4096)
 def abbrev_crust_token(crust: str) -> str:
     s = (crust or "").lower()
     mapping = {
@@ -407,8 +643,7 @@ def product_key_for_variant(
     for k in ("id", "sku", "code", "variantId", "variant_id"):
         v = variant.get(k)
         if v is not None and str(v).strip():
-            vid = _SLUG_BAD_FOR_KEY.sub("_", str(v).lower())
-            vid = re.sub(r"_+", "_", vid).strip("_")[:32]
+            vid = _SLUG_BAD_FOR_KEY.sub("_", str(v).lower()).strip("_")[:32]
             if vid:
                 return f"ph_{vid}_{abbrev_size_token(size)}_{abbrev_crust_token(crust)}"
 
@@ -421,16 +656,17 @@ def product_key_for_variant(
     return f"ph_{base}_{abbrev_size_token(size)}_{abbrev_crust_token(crust)}"
 
 
+_PROVINCE_KEYS = ("region", "province", "state")
+
+
 def _hut_city_province(h: Dict[str, Any]) -> Tuple[str, str]:
-    city, prov = "", ""
-    addr = h.get("address") or {}
-    city = (addr.get("city") or "").strip()
-    prov = (
-        addr.get("region")
-        or addr.get("province")
-        or addr.get("state")
-        or ""
-    ).strip()
+    addr = h.get("address")
+    if not addr:
+        return "", ""
+    city = addr.get("city")
+    city = city.strip() if city else ""
+    prov = _first_truthy(addr, _PROVINCE_KEYS)
+    prov = prov.strip() if prov else ""
     lines = addr.get("lines")
 
     # fallback if city is embedded in the address lines
@@ -446,7 +682,46 @@ def _hut_city_province(h: Dict[str, Any]) -> Tuple[str, str]:
 @dataclass
 class StoreResult:
     store_key: str
-    rows: List[Dict[str, Any]]
+    rows: List[Tuple[Any, ...]]
+
+
+# ── product / variant field keys (first truthy wins) ─────────────
+
+_VARIANT_COLLECTION_KEYS = (
+    "priceVariants",
+    "sizePrices",
+    "variants",
+    "variantPrices",
+    "sizes",
+    "items",
+)
+# product-level fields copied into a synthesized variant
+_PRODUCT_VARIANT_FIELDS = (
+    "size",
+    "sizeKey",
+    "sizeName",
+    "crust",
+    "dough",
+    "style",
+    "price",
+    "unitPrice",
+    "priceCents",
+    "key",
+    "label",
+    "id",
+)
+_KEYISH_KEYS = ("key", "label", "id")
+_SIZE_KEYS = ("size", "sizeKey", "sizeSlug", "sizeName")
+_CRUST_KEYS = ("crust", "dough", "style")
+
+
+def _first_truthy(d: Dict[str, Any], keys: Tuple[str, ...]) -> Any:
+    """Return the first truthy d[k] for k in keys, else ""."""
+    for k in keys:
+        val = d.get(k)
+        if val:
+            return val
+    return ""
 
 
 # ── worker (one hut) ─────────────────────────────────────────────
@@ -467,7 +742,7 @@ def scrape_store(hut: Dict[str, Any]) -> StoreResult:
     if sector:
         params_primary["sector"] = sector
 
-    rows: List[Dict[str, Any]] = []
+    rows: List[Tuple[Any, ...]] = []
 
     # We try primary params, and fall back to a minimal set if needed
     for params in (params_primary, {"hutid": sid, "collection": "true"}):
@@ -488,11 +763,6 @@ def scrape_store(hut: Dict[str, Any]) -> StoreResult:
         if not isinstance(products, list):
             continue
 
-        today = datetime.today()
-        date_key = today.strftime("%Y-%m-%d")
-        month = today.strftime("%B")
-        year = str(today.year)
-
         for prod in products:
             if not isinstance(prod, dict):
                 continue
@@ -506,58 +776,28 @@ def scrape_store(hut: Dict[str, Any]) -> StoreResult:
                 )
 
             # gather variants
-            variants = None
-            for k in (
-                "priceVariants",
-                "sizePrices",
-                "variants",
-                "variantPrices",
-                "sizes",
-                "items",
-            ):
-                v = prod.get(k)
-                if isinstance(v, list) and v:
-                    variants = v
-                    break
+            variants = next(
+                (
+                    c
+                    for c in map(prod.get, _VARIANT_COLLECTION_KEYS)
+                    if isinstance(c, list) and c
+                ),
+                None,
+            )
 
             if not variants:
                 # synthesize a "variant" from product-level fields if necessary
-                v = {}
-                for k in (
-                    "size",
-                    "sizeKey",
-                    "sizeName",
-                    "crust",
-                    "dough",
-                    "style",
-                    "price",
-                    "unitPrice",
-                    "priceCents",
-                    "key",
-                    "label",
-                    "id",
-                ):
-                    if k in prod:
-                        v[k] = prod[k]
+                v = {k: prod[k] for k in _PRODUCT_VARIANT_FIELDS if k in prod}
                 variants = [v] if v else []
 
             for v in variants:
-                keyish = str(
-                    v.get("key") or v.get("label") or v.get("id") or ""
-                )
+                keyish = str(_first_truthy(v, _KEYISH_KEYS))
                 size = normalize_size(
-                    v.get("size")
-                    or v.get("sizeKey")
-                    or v.get("sizeSlug")
-                    or v.get("sizeName")
-                    or "",
+                    _first_truthy(v, _SIZE_KEYS),
                     fallback_from_text=keyish,
                 )
                 crust = normalize_crust(
-                    v.get("crust")
-                    or v.get("dough")
-                    or v.get("style")
-                    or "",
+                    _first_truthy(v, _CRUST_KEYS),
                     fallback_from_key=keyish,
                 )
                 if not crust:
@@ -571,24 +811,23 @@ def scrape_store(hut: Dict[str, Any]) -> StoreResult:
                     f"PH_{base_product_key}"  # pipeline-wide prefix
                 )
 
+                # column order matches OUT_HEADER
                 rows.append(
-                    {
-                        "chain_key": CHAIN_KEY,
-                        "store_key": store_key_prefixed,
-                        "city": city,
-                        "province": province,
-                        "category": "Pizza",
-                        "recipe": recipe,
-                        "product_key": product_key_prefixed,
-                        "size": size,
-                        "crust": crust,
-                        "price": (
-                            price if isinstance(price, (int, float)) else ""
-                        ),
-                        "date_key": date_key,
-                        "month": month,
-                        "year": year,
-                    }
+                    (
+                        CHAIN_KEY,
+                        store_key_prefixed,
+                        city,
+                        province,
+                        "Pizza",
+                        recipe,
+                        product_key_prefixed,
+                        size,
+                        crust,
+                        price if isinstance(price, (int, float)) else "",
+                        DATE_KEY,
+                        MONTH,
+                        YEAR,
+                    )
                 )
 
         break  # stop after first successful response
@@ -598,19 +837,34 @@ def scrape_store(hut: Dict[str, Any]) -> StoreResult:
 
 # ── blast loop ──────────────────────────────────────────────────
 
-def blast_all(huts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def blast_all(huts: List[Dict[str, Any]], out_q: queue.Queue) -> set[str]:
     """
     Blast the huts in waves, respecting throttle signals from the API.
-    """
-    remaining = {h.get("id") for h in huts if h.get("id")}
-    pizzas_rows: List[Dict[str, Any]] = []
 
-    while remaining:
-        STOP_FLAG.clear()
-        batch = [h for h in huts if h.get("id") in remaining]
-        print(f"\nBlasting {len(batch):,} huts …")
+    Each accepted hut's rows are handed to the CSV writer via `out_q` as
+    soon as its future completes (results abandoned on a throttle are not,
+    since those huts are re-scraped next wave). Returns the store keys that
+    produced rows.
+    """
+    id_to_hut: Dict[str, Dict[str, Any]] = {}
+    for h in huts:
+        if h.get("id"):
+            id_to_hut.setdefault(h["id"], h)  # first listing wins on dup ids
+    remaining = set(id_to_hut)
+    stores_with_rows: set[str] = set()
+    wave_idx = 0  # throttled waves so far; drives the backoff exponent
+
+    # One pool for the whole run; throttled waves resubmit to the same threads.
+    exe = ThreadPoolExecutor(
+        max_workers=max(1, min(MAX_WORKERS, len(id_to_hut)))
+    )
+    try:
+        while remaining:
+            STOP_FLAG.clear()
+            retry_after = 0.0
+            batch = [id_to_hut[i] for i in remaining]
+            print(f"\nBlasting {len(batch):,} huts …")
 
-        with ThreadPoolExecutor(max_workers=32) as exe:
             futs = {exe.submit(scrape_store, h): h for h in batch}
             for fut in tqdm(
                 as_completed(futs),
@@ -621,8 +875,12 @@ def blast_all(huts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
                 sid = hut.get("id")
                 try:
                     result: StoreResult = fut.result()
-                    pizzas_rows.extend(result.rows)
-                except Throttled:
+                    if result.rows:
+                        # blocks while the writer is behind (bounded queue)
+                        out_q.put(result.rows)
+                        stores_with_rows.add(result.store_key)
+                except Throttled as e:
+                    retry_after = max(retry_after, e.retry_after or 0.0)
                     # Cancel outstanding futures and back off
                     for f in futs:
                         f.cancel()
@@ -633,14 +891,23 @@ def blast_all(huts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
                 finally:
                     remaining.discard(sid)
 
-        if remaining and STOP_FLAG.is_set():
-            print(f"\nThrottle – cooling down {COOLDOWN_SECS}s …\n")
-            time.sleep(COOLDOWN_SECS)
+            # let in-flight workers settle before the cooldown / next wave
+            wait(futs)
 
-    return pizzas_rows
+            if remaining and STOP_FLAG.is_set():
+                delay = max(
+                    retry_after, backoff_delay(wave_idx, base=COOLDOWN_SECS)
+                )
+                wave_idx += 1
+                print(f"\nThrottle – cooling down {delay:.1f}s …\n")
+                time.sleep(delay)
+    finally:
+        exe.shutdown(wait=True, cancel_futures=True)
+
+    return stores_with_rows
 
 
-# ── CSV writer ───────────────────────────────────────────────────
+# ── output writers ──────────────────────────────────────────────
 
 OUT_HEADER = [
     "chain_key",
@@ -657,30 +924,147 @@ OUT_HEADER = [
     "month",
     "year",
 ]
+_PRICE_IDX = OUT_HEADER.index("price")
+
+CSV_BUFFER_BYTES = 1 << 20  # fewer, larger write() syscalls
+PARQUET_ROW_GROUP_ROWS = 122_880  # matches DuckDB's default row group size
 
 
-def write_csv(path: Path, rows: List[Dict[str, Any]]) -> None:
-    """Write rows to CSV using the fixed OUT_HEADER schema."""
-    if not rows:
-        print(f"[warn] No data for {path.name}")
-        return
+class CsvSink:
+    """Append row tuples to a CSV (header written on the first batch)."""
 
-    with path.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(
-            f,
-            fieldnames=OUT_HEADER,
-            extrasaction="ignore",
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._f = None
+        self._writer = None
+
+    def write(self, batch: List[Tuple[Any, ...]]) -> None:
+        if self._writer is None:
+            self._f = self.path.open(
+                "w",
+                newline="",
+                encoding="utf-8",
+                buffering=CSV_BUFFER_BYTES,
+            )
+            self._writer = csv.writer(self._f)
+            self._writer.writerow(OUT_HEADER)
+        self._writer.writerows(batch)
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+
+
+class ParquetSink:
+    """
+    Buffer row tuples column-wise and write ZSTD Parquet row groups.
+
+    Every column but price is a low-cardinality string, so pyarrow's default
+    dictionary encoding stores them as small integer indices.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._writer = None
+        self._cols: List[list] = [[] for _ in OUT_HEADER]
+        self._n = 0
+
+    def write(self, batch: List[Tuple[Any, ...]]) -> None:
+        for col, vals in zip(self._cols, zip(*batch)):
+            col.extend(vals)
+        self._n += len(batch)
+        if self._n >= PARQUET_ROW_GROUP_ROWS:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._n:
+            return
+        cols = self._cols
+        cols[_PRICE_IDX] = [p if p != "" else None for p in cols[_PRICE_IDX]]
+        table = pa.Table.from_arrays(
+            [pa.array(c, type=f.type) for c, f in zip(cols, PARQUET_SCHEMA)],
+            schema=PARQUET_SCHEMA,
         )
-        writer.writeheader()
-        for r in rows:
-            writer.writerow({k: r.get(k, "") for k in OUT_HEADER})
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(
+                self.path, PARQUET_SCHEMA, compression="zstd"
+            )
+        self._writer.write_table(table)
+        self._cols = [[] for _ in OUT_HEADER]
+        self._n = 0
+
+    def close(self) -> None:
+        try:
+            self._flush()
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+
+
+if pa is not None:
+    PARQUET_SCHEMA = pa.schema(
+        [
+            (c, pa.float64() if c == "price" else pa.string())
+            for c in OUT_HEADER
+        ]
+    )
+
 
-    print(f"✓ Wrote {len(rows):,} rows → {path}")
+class RowWriterThread(threading.Thread):
+    """
+    Drain row batches from a queue into a sink until a `None` sentinel.
+
+    Sinks open their file on the first batch, so an empty run leaves no file
+    behind. After a write error the thread keeps draining so producers never
+    block on a full queue; the error is kept on `.error`.
+    """
+
+    def __init__(self, sink: CsvSink | ParquetSink, rows_q: queue.Queue) -> None:
+        super().__init__(name="row-writer", daemon=True)
+        self.sink = sink
+        self.rows_q = rows_q
+        self.rows_written = 0
+        self.error: BaseException | None = None
+
+    def run(self) -> None:
+        try:
+            while True:
+                batch = self.rows_q.get()
+                if batch is None:
+                    break
+                if self.error is not None:
+                    continue
+                try:
+                    self.sink.write(batch)
+                    self.rows_written += len(batch)
+                except Exception as e:  # pragma: no cover - disk errors
+                    self.error = e
+        finally:
+            try:
+                self.sink.close()
+            except Exception as e:  # pragma: no cover - disk errors
+                self.error = self.error or e
 
 
 # ── main ─────────────────────────────────────────────────────────
 
-def main() -> None:
+def main(argv: List[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(
+        description="Pizza Hut Canada -> pizza-only Parquet/CSV scraper"
+    )
+    ap.add_argument(
+        "--csv",
+        action="store_true",
+        help="Write CSV instead of Parquet (the default when pyarrow is installed)",
+    )
+    args = ap.parse_args(argv)
+
+    use_parquet = not args.csv and pq is not None
+    if not args.csv and pq is None:
+        print("[warn] pyarrow not installed – writing CSV instead")
+    out_file = OUT_FILE_PARQUET if use_parquet else OUT_FILE
+    sink = ParquetSink(out_file) if use_parquet else CsvSink(out_file)
+
     start = datetime.now()
 
     huts = fetch_huts_with_backoff()
@@ -690,11 +1074,24 @@ def main() -> None:
 
     print(f"Total huts: {len(huts):,}")
 
-    pizzas_rows = blast_all(huts)
-    write_csv(OUT_FILE, pizzas_rows)
+    rows_q: queue.Queue = queue.Queue(maxsize=64)
+    writer = RowWriterThread(sink, rows_q)
+    writer.start()
+    try:
+        stores_with_rows = blast_all(huts, rows_q)
+    finally:
+        rows_q.put(None)
+        writer.join()
+
+    if writer.error is not None:
+        raise writer.error
+    if writer.rows_written:
+        print(f"✓ Wrote {writer.rows_written:,} rows → {out_file}")
+    else:
+        print(f"[warn] No data for {out_file.name}")
 
     elapsed = (datetime.now() - start).seconds / 60
-    hut_count = len({r["store_key"] for r in pizzas_rows})
+    hut_count = len(stores_with_rows)
     print(f"\n✓ Finished in {elapsed:.1f} min (huts processed: {hut_count:,})")
 
 
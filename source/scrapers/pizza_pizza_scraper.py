@@ -15,6 +15,7 @@ export an analytics-ready CSV compatible with the pricing pipeline:
 Key behaviours
 --------------
 - Only the **Pizza** category subtree is scraped.
+- Product lists come from the delivery menu (pickup only if delivery is empty).
 - For each pizza, the configurator is parsed to:
   - Expand all size × crust combinations.
   - Apply crust upcharges on top of per-size base prices.
@@ -30,7 +31,7 @@ Default (scrape a range of store IDs and write to `data/raw/`):
 
 Optional arguments:
 
-    -o, --outfile   Custom CSV path
+    -o, --outfile   Custom CSV path (a `.csv.gz` suffix writes gzip'd CSV)
     -p, --pool      Number of concurrent stores (default: 32)
     --ids           Store IDs (e.g. "1-500", "1,2,3", or "10")
     --token         Override Pizza Pizza session token (pp-mw-session)
@@ -39,6 +40,7 @@ Dependencies
 ------------
 - requests
 - tqdm
+- orjson (optional; faster JSON parsing, falls back to `json`)
 """
 
 from __future__ import annotations
@@ -47,24 +49,21 @@ import argparse
 import base64
 import csv
 import datetime as dt
-import json
+import gzip
+import hashlib
 import os
 import random
 import re
+import secrets
 import threading
-import time
-import uuid
 import zlib
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import requests
-from requests.exceptions import (
-    ConnectionError as ConnErr,
-    HTTPError,
-    ReadTimeout,
-)
+from requests.adapters import HTTPAdapter, Retry
 
 # tqdm fallback if not installed
 try:  # pragma: no cover - optional dependency
@@ -73,6 +72,12 @@ except Exception:  # pragma: no cover
     def tqdm(x=None, total=None, desc=None):
         return x
 
+# orjson decodes the configurator payloads straight from bytes; stdlib fallback
+try:  # pragma: no cover - optional dependency
+    from orjson import loads as json_loads
+except ImportError:  # pragma: no cover
+    from json import loads as json_loads
+
 
 # ---------------- destination + constants ----------------
 
@@ -91,9 +96,29 @@ SESSION_TOKEN = os.getenv(
 
 ID_RANGE_DEFAULT = range(1, 2001)  # default store-ID range (override with --ids)
 MAX_RETRIES = 10
-RETRY_STATUS = {415, 429, 500, 502, 503}
+NO_RETRY_STATUS = {400, 404}  # permanent for this request; any other >= 400 retries
+RETRY_BACKOFF_MAX = 8.0  # seconds; caps the exponential backoff per retry
+RETRY_JITTER = 0.25  # seconds of random spread added to each backoff
 REQ_TIMEOUT = 20
 POOL_SIZE_DEFAULT = 32
+CSV_BUFFER_BYTES = 1 << 23  # 8 MiB: a full run reaches disk in a handful of write()s
+GZIP_LEVEL = 1  # the CSV is highly repetitive: level 1 already shrinks it ~5-10x
+
+OUT_COLS = [
+    "chain_key",
+    "store_key",
+    "city",
+    "province",
+    "category",
+    "recipe",
+    "product_key",
+    "size",
+    "crust",
+    "price",
+    "date_key",
+    "month",
+    "year",
+]
 
 BASE = "https://www.pizzapizza.ca"
 PIZZA_ROOT_ID = 10020  # "Pizza" category root
@@ -103,12 +128,39 @@ PRODUCT_LIST = "/ajax/catalog/api/v1/product_list/{store_id}/{mode}"
 CONFIGURATOR = "/ajax/catalog/api/v1/product/config/{store_id}"
 STORE_DETAILS = "/ajax/store/api/v1/store_details/?store_id={store_id}"
 
-# ---------------- session (thread-local) ----------------
+# ---------------- session (shared keep-alive pool) ----------------
 
-_thread = threading.local()
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class _PPRetry(Retry):
+    """
+    Retry every HTTP error status except NO_RETRY_STATUS (so 504 and other
+    gateway/transient codes are covered), with jittered, capped backoff.
+    Only uses hooks present in both urllib3 1.26 and 2.x.
+    """
 
+    def is_retry(
+        self, method: str, status_code: int, has_retry_after: bool = False
+    ) -> bool:
+        if not self._is_method_retryable(method):
+            return False
+        return status_code >= 400 and status_code not in NO_RETRY_STATUS
 
-def make_session(sess_token: str) -> requests.Session:
+    def get_backoff_time(self) -> float:
+        backoff = super().get_backoff_time() + random.uniform(0, RETRY_JITTER)
+        return min(RETRY_BACKOFF_MAX, backoff)
+
+
+def make_session(
+    sess_token: str, pool_size: int = POOL_SIZE_DEFAULT
+) -> requests.Session:
+    """
+    Build the Session shared by all workers: a keep-alive pool sized for the
+    worker count, with retry/backoff for throttling and transient errors
+    handled by urllib3 (honouring Retry-After).
+    """
     s = requests.Session()
     s.headers.update(
         {
@@ -120,16 +172,48 @@ def make_session(sess_token: str) -> requests.Session:
         }
     )
     s.cookies.set("pp-mw-session", sess_token, domain="pizzapizza.ca")
+    retry = _PPRetry(
+        total=MAX_RETRIES,
+        allowed_methods={"GET"},
+        backoff_factor=0.35,
+        respect_retry_after_header=True,
+        raise_on_status=False,  # hand back the last response; raise_for_status decides
+    )
+    s.mount(
+        "https://",
+        HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size * 2,
+            max_retries=retry,
+        ),
+    )
     return s
 
 
 def session() -> requests.Session:
-    if not hasattr(_thread, "s"):
-        _thread.s = make_session(SESSION_TOKEN)
-    return _thread.s
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = make_session(SESSION_TOKEN)
+    return _session
+
 
+# ---------------- http helper ----------------
+
+_thread = threading.local()
+
+
+def _next_request_id() -> str:
+    """Unique per-request id: random per-thread prefix + counter (no syscall)."""
+    try:
+        n = _thread.rid_n
+    except AttributeError:
+        _thread.rid_prefix = secrets.token_hex(6)
+        n = 0
+    _thread.rid_n = n + 1
+    return f"{_thread.rid_prefix}-{n}"
 
-# ---------------- http helper with retry/backoff ----------------
 
 def get_json(
     url: str,
@@ -138,36 +222,24 @@ def get_json(
     refer_store: Optional[int] = None,
 ) -> Any:
     """
-    Basic GET+JSON wrapper with retry/backoff for throttling and transient errors.
-    """
-    for attempt in range(1, MAX_RETRIES + 1):
-        try:
-            hdrs = {"X-Request-ID": str(uuid.uuid4())}
-            if refer_store is not None:
-                hdrs["Referer"] = f"{BASE}/store/{refer_store}/delivery"
+    Basic GET+JSON wrapper; retries/backoff happen in the session's adapter.
 
-            r = session().get(
-                url,
-                headers=hdrs,
-                params=params,
-                timeout=REQ_TIMEOUT,
-            )
-            if r.status_code in RETRY_STATUS:
-                raise HTTPError(f"retryable {r.status_code}", response=r)
-            r.raise_for_status()
-            return r.json()
-
-        except (ReadTimeout, ConnErr, HTTPError) as e:
-            # 400/404 => permanent for this request
-            if (
-                isinstance(e, HTTPError)
-                and e.response is not None
-                and e.response.status_code in (400, 404)
-            ):
-                raise
-            if attempt == MAX_RETRIES:
-                raise
-            time.sleep(0.35 * attempt + random.uniform(0, 0.25))
+    Raises HTTPError for a non-2xx final response (400/404 are never retried)
+    and ConnectionError/ReadTimeout once retries are exhausted.
+    """
+    hdrs = {"X-Request-ID": _next_request_id()}
+    if refer_store is not None:
+        hdrs["Referer"] = f"{BASE}/store/{refer_store}/delivery"
+
+    r = session().get(
+        url,
+        headers=hdrs,
+        params=params,
+        timeout=REQ_TIMEOUT,
+    )
+    r.raise_for_status()
+    # bytes straight to the parser: skips requests' charset sniffing in r.json()
+    return json_loads(r.content)
 
 
 # ---------------- small utils ----------------
@@ -196,17 +268,28 @@ def parse_id_range(arg: Optional[str]) -> Iterable[int]:
     return [int(s)]
 
 
+_NUM_STRIP_RX = re.compile(r"[^0-9.\-]")
+_NUM_CLEAN_RX = re.compile(r"-?[0-9]+(?:\.[0-9]+)?")
+
+
 def num(x: Any) -> Optional[float]:
     """Best-effort numeric conversion, returning float or None."""
     if isinstance(x, (int, float)):
         return float(x)
     if isinstance(x, str):
-        z = re.sub(r"[^0-9.\-]", "", x)
-        if z and re.match(r"^-?\d+(\.\d+)?$", z):
-            try:
-                return float(z)
-            except Exception:
-                return None
+        return _num_str(x)
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _num_str(x: str) -> Optional[float]:
+    # fast path: already clean (most API prices, e.g. "12.99"). Not a bare
+    # float() try: that would also accept "1e3", "inf", " 7 ", non-ASCII digits
+    if _NUM_CLEAN_RX.fullmatch(x):
+        return float(x)
+    z = _NUM_STRIP_RX.sub("", x)
+    if z and _NUM_CLEAN_RX.fullmatch(z):
+        return float(z)
     return None
 
 
@@ -260,22 +343,36 @@ def pizza_category_ids_and_names(
             id_to_parent[cid] = int(c.get("parent_id") or 0)
             id_to_name[cid] = c.get("name") or ""
 
-    def is_descendant(cid: int, root: int) -> bool:
-        seen = set()
-        while cid and cid not in seen:
-            seen.add(cid)
+    # memo: does this id have PIZZA_ROOT_ID among its ancestors? Each walk
+    # back-fills every id it visited, so each parent link is followed once.
+    under_root: Dict[int, bool] = {}
+
+    def is_descendant(cid: int) -> bool:
+        path: List[int] = []
+        on_path = set()
+        found = False
+        while cid and cid not in on_path:
+            if cid in under_root:
+                found = under_root[cid]
+                break
+            path.append(cid)
+            on_path.add(cid)
             pid = id_to_parent.get(cid, 0)
-            if pid == root:
-                return True
+            if pid == PIZZA_ROOT_ID:
+                found = True
+                break
             cid = pid
-        return False
+        # a cycle that never reaches the root leaves found=False for all
+        for v in path:
+            under_root[v] = found
+        return found
 
     pizza_ids: List[int] = []
     for c in categories:
         cid = c.get("id")
         if not isinstance(cid, int):
             continue
-        if cid == PIZZA_ROOT_ID or is_descendant(cid, PIZZA_ROOT_ID):
+        if cid == PIZZA_ROOT_ID or is_descendant(cid):
             if c.get("products_available"):
                 pizza_ids.append(cid)
 
@@ -289,10 +386,51 @@ def pizza_category_ids_and_names(
     return sorted(set(pizza_ids)), id_to_name
 
 
+# Most stores share one category tree: memoize the Pizza subtree by a
+# fingerprint of just the fields pizza_category_ids_and_names reads.
+CAT_CACHE_MAX = 256
+_cat_cache: Dict[tuple, Tuple[List[int], Dict[int, str]]] = {}
+_cat_cache_lock = threading.Lock()
+
+
+def pizza_categories_cached(
+    categories: List[dict],
+) -> Tuple[List[int], Dict[int, str]]:
+    """
+    pizza_category_ids_and_names, shared across stores with the same tree.
+    The returned list/dict are shared between callers: treat as read-only.
+    """
+    try:
+        key = tuple(
+            (
+                type(c.get("id")),  # 1 == 1.0 == True, but only ints count
+                c.get("id"),
+                c.get("parent_id"),
+                c.get("name"),
+                bool(c.get("products_available")),
+            )
+            for c in categories
+        )
+        hit = _cat_cache.get(key)
+    except (AttributeError, TypeError):  # odd payload: no fingerprint
+        return pizza_category_ids_and_names(categories)
+    if hit is not None:
+        return hit
+    res = pizza_category_ids_and_names(categories)
+    with _cat_cache_lock:
+        if len(_cat_cache) >= CAT_CACHE_MAX:
+            _cat_cache.pop(next(iter(_cat_cache)))
+        _cat_cache[key] = res
+    return res
+
+
 # ---------------- products (from product_list) ----------------
 
 def fetch_products_for_category(store_id: int, category_id: int) -> List[dict]:
-    prods: List[dict] = []
+    """
+    Product list for one category. The pickup menu is only requested when
+    delivery fails or comes back empty: it otherwise repeats the same pids.
+    """
     params = {"category_id": str(category_id)}
     for mode in ("delivery", "pickup"):
         try:
@@ -302,29 +440,43 @@ def fetch_products_for_category(store_id: int, category_id: int) -> List[dict]:
                 refer_store=store_id,
             )
             items = (data or {}).get("products") or (data or {}).get("items") or []
-            if isinstance(items, list):
-                prods.extend(items)
         except Exception:
             continue
-    return prods
+        if isinstance(items, list) and items:
+            return items
+    return []
 
 
-def discover_pizza_products(store_id: int) -> List[dict]:
+def discover_pizza_products(
+    store_id: int,
+    fetch_ex: Optional[ThreadPoolExecutor] = None,
+) -> List[dict]:
     """
     Build a unique product index limited to Pizza categories.
 
+    With `fetch_ex`, the per-category product_list fetches run concurrently
+    on that executor; results are still merged in category order.
+
     Returns list of dicts:
         {pid, slug, name, start_price, cat_names: set[str]}
     """
     cats = fetch_categories(store_id)
-    pizza_ids, id_to_name = pizza_category_ids_and_names(cats)
+    pizza_ids, id_to_name = pizza_categories_cached(cats)
     if not pizza_ids:
         return []
 
+    def _products(cid: int) -> List[dict]:
+        return fetch_products_for_category(store_id, cid)
+
+    if fetch_ex is not None:
+        per_cat = list(fetch_ex.map(_products, pizza_ids))
+    else:
+        per_cat = [_products(cid) for cid in pizza_ids]
+
     idx: Dict[str, dict] = {}
-    for cid in pizza_ids:
+    for cid, cat_products in zip(pizza_ids, per_cat):
         cat_name = id_to_name.get(cid, "")
-        for p in fetch_products_for_category(store_id, cid):
+        for p in cat_products:
             pid = str(p.get("product_id") or "")
             if not pid:
                 continue
@@ -383,13 +535,20 @@ def fetch_config(store_id: int, slug: str) -> Optional[dict]:
 
 
 def _walk(obj: Any):
-    if isinstance(obj, dict):
-        yield obj
-        for v in obj.values():
-            yield from _walk(v)
-    elif isinstance(obj, list):
-        for v in obj:
-            yield from _walk(v)
+    """Yield every dict in a JSON tree, pre-order (iterative: no deep recursion)."""
+    stack = [obj]
+    while stack:
+        cur = stack.pop()
+        if isinstance(cur, dict):
+            yield cur
+            children = cur.values()
+        elif isinstance(cur, list):
+            children = cur
+        else:
+            continue
+        stack.extend(
+            v for v in reversed(children) if isinstance(v, (dict, list))
+        )
 
 
 def _is_group(d: dict) -> bool:
@@ -415,32 +574,88 @@ def _option_label(opt: dict) -> str:
     )
 
 
+# Option keys that carry a price: the exact spellings seen in the API, with a
+# (memoized) substring regex for anything else.
+_PRICE_KEYS = frozenset(
+    {
+        "price",
+        "price_value",
+        "amount",
+        "final_price",
+        "price_delta",
+        "delta",
+        "difference",
+        "value",
+    }
+)
+_PRICE_KEY_RX = re.compile(r"price|amount|delta|difference|value|final")
+
+
+@lru_cache(maxsize=1024)
+def _is_price_key(k: Any) -> bool:
+    return _PRICE_KEY_RX.search(str(k).lower()) is not None
+
+
 def _option_price_fields(opt: dict) -> List[float]:
     vals: List[float] = []
     if not isinstance(opt, dict):
         return vals
     for k, v in opt.items():
-        kl = str(k).lower()
-        if any(x in kl for x in ("price", "amount", "delta", "difference", "value", "final")):
+        if k in _PRICE_KEYS or _is_price_key(k):
             f = num(v)
             if f is not None:
                 vals.append(f)
     return vals
 
 
-def _find_group(config: dict, keyset: set[str]) -> Optional[dict]:
-    # exact
+_MATRIX_PRICE_KEYS = {"price", "price_value", "amount", "final_price"}
+
+
+# Configurator key names come from a small fixed vocabulary repeated across
+# every dict of every payload: lowercase/classify each distinct key once.
+@lru_cache(maxsize=4096)
+def _lower_key(k: str) -> str:
+    return k.lower()
+
+
+@lru_cache(maxsize=4096)
+def _label_key_kind(k: Any) -> Tuple[bool, bool]:
+    """(names a size?, names a crust?) for a dict key in a price matrix."""
+    kl = str(k).lower()
+    return "size" in kl, ("crust" in kl or "dough" in kl)
+
+
+def _index_config(config: dict) -> Tuple[List[dict], List[dict]]:
+    """
+    Walk the configurator once, returning (groups, priced): the option-group
+    dicts and the dicts carrying a price-like key, both in walk order.
+    """
+    groups: List[dict] = []
+    priced: List[dict] = []
     for d in _walk(config):
         if _is_group(d):
-            gname = _group_name(d).strip().lower()
-            if gname in keyset:
-                return d
+            groups.append(d)
+        if not _MATRIX_PRICE_KEYS.isdisjoint(map(_lower_key, d)):
+            priced.append(d)
+    return groups, priced
+
+
+def _find_group(
+    config: dict,
+    keyset: set[str],
+    groups: Optional[List[dict]] = None,
+) -> Optional[dict]:
+    if groups is None:
+        groups = _index_config(config)[0]
+    names = [_group_name(d).strip().lower() for d in groups]
+    # exact
+    for d, gname in zip(groups, names):
+        if gname in keyset:
+            return d
     # fuzzy contains
-    for d in _walk(config):
-        if _is_group(d):
-            gname = _group_name(d).strip().lower()
-            if any(k in gname for k in keyset):
-                return d
+    for d, gname in zip(groups, names):
+        if any(k in gname for k in keyset):
+            return d
     return None
 
 
@@ -448,6 +663,10 @@ def _find_group(config: dict, keyset: set[str]) -> Optional[dict]:
 _INCHES_RX = re.compile(r'(?<!\d)(10|11|12|13|14|15|16|18|20|22|24)\s*["”]')
 
 
+# The label vocabulary is tiny but these run per variant, so the normalizers
+# below are memoized. (Their substring cascades stay as-is: an alternation
+# regex returns the leftmost hit, not the first rule in precedence order.)
+@lru_cache(maxsize=1024)
 def _canonical_size(label: str) -> str:
     s = label.strip().lower()
     if "xxl" in s or "x x l" in s:
@@ -472,6 +691,7 @@ def _canonical_size(label: str) -> str:
     return label.strip() or "Small"
 
 
+@lru_cache(maxsize=1024)
 def _canonical_crust(label: str) -> str:
     s = (label or "").strip().lower()
     if not s:
@@ -504,31 +724,35 @@ def _starting_price_from_product(p: dict) -> Optional[float]:
     return num(p.get("price"))
 
 
-def _try_price_matrix(config: dict) -> Dict[Tuple[str, str], float]:
+def _try_price_matrix(
+    config: dict,
+    priced: Optional[List[dict]] = None,
+) -> Dict[Tuple[str, str], float]:
     """
     Fallback parser that hunts for embedded price matrices in the raw config JSON
     if js_data fails. Returns {(size, crust): price}.
     """
+    if priced is None:
+        priced = _index_config(config)[1]
     result: Dict[Tuple[str, str], float] = {}
-    for d in _walk(config):
-        if isinstance(d, dict):
-            keys = set(k.lower() for k in d.keys())
-            if {"price"} & keys or {"price_value"} & keys or {"amount"} & keys or {"final_price"} & keys:
-                price = num(d.get("price") or d.get("price_value") or d.get("amount") or d.get("final_price"))
-                if price is None:
-                    continue
-                size_label = None
-                crust_label = None
-                for k, v in d.items():
-                    kl = str(k).lower()
-                    if "size" in kl and isinstance(v, str):
-                        size_label = v
-                    if ("crust" in kl or "dough" in kl) and isinstance(v, str):
-                        crust_label = v
-                if size_label:
-                    size = _canonical_size(size_label)
-                    crust = _canonical_crust(crust_label or "Regular Dough")
-                    result[(size, crust)] = price
+    for d in priced:
+        price = num(d.get("price") or d.get("price_value") or d.get("amount") or d.get("final_price"))
+        if price is None:
+            continue
+        size_label = None
+        crust_label = None
+        for k, v in d.items():
+            if not isinstance(v, str):
+                continue
+            is_size, is_crust = _label_key_kind(k)
+            if is_size:
+                size_label = v
+            if is_crust:
+                crust_label = v
+        if size_label:
+            size = _canonical_size(size_label)
+            crust = _canonical_crust(crust_label or "Regular Dough")
+            result[(size, crust)] = price
     return result
 
 
@@ -538,6 +762,11 @@ def infer_crust_from_context(
     cat_names: Iterable[str],
 ) -> Optional[str]:
     ctx = " ".join([recipe or ""] + [c or "" for c in cat_names or []]).lower()
+    return _crust_from_context(ctx)
+
+
+@lru_cache(maxsize=1024)
+def _crust_from_context(ctx: str) -> Optional[str]:
     if "stuffed" in ctx:
         return "Stuffed Crust"
     if "gourmet thin" in ctx or "gourmet thins" in ctx or ("thin" in ctx and "crust" in ctx):
@@ -562,11 +791,106 @@ def _decode_js_data(js_data: str) -> Optional[dict]:
     try:
         raw = base64.b64decode(js_data)
         dec = zlib.decompress(raw, zlib.MAX_WBITS).decode("utf-8")
-        return json.loads(dec)
+        return json_loads(dec)
     except Exception:
         return None
 
 
+JsVariants = Tuple[Tuple[Tuple[str, str, float], ...], bool]
+
+# js_data strings run to several KB, so cache entries are keyed by a 16-byte
+# digest instead of the string itself; bounded, oldest entry evicted first
+JS_CACHE_MAX = 4096
+_js_cache: Dict[Tuple[bytes, Tuple[Tuple[str, str], ...]], JsVariants] = {}
+_js_cache_lock = threading.Lock()
+
+
+def _js_data_variants(
+    js_data: str,
+    id2title_items: Tuple[Tuple[str, str], ...],
+) -> JsVariants:
+    """
+    Expand js_data (per-size base + per-crust deltas) into (size, crust, price)
+    variants. Memoized: stores on a shared menu template send identical
+    js_data, and the result depends only on it and the option-id titles.
+
+    Returns (variants, complete); `complete` is False when parsing stopped
+    part-way, in which case the caller keeps the partial variants and falls
+    through to the other strategies.
+    """
+    key = (
+        hashlib.blake2b(
+            js_data.encode("utf-8", "surrogatepass"), digest_size=16
+        ).digest(),
+        id2title_items,
+    )
+    hit = _js_cache.get(key)
+    if hit is not None:
+        return hit
+    res = _expand_js_data(js_data, id2title_items)
+    with _js_cache_lock:
+        if len(_js_cache) >= JS_CACHE_MAX:
+            _js_cache.pop(next(iter(_js_cache)))
+        _js_cache[key] = res
+    return res
+
+
+def _expand_js_data(
+    js_data: str,
+    id2title_items: Tuple[Tuple[str, str], ...],
+) -> JsVariants:
+    """Uncached body of _js_data_variants."""
+    js_obj = _decode_js_data(js_data)
+    if not isinstance(js_obj, dict):
+        return (), False
+
+    id2title = dict(id2title_items)
+    variants: List[Tuple[str, str, float]] = []
+    try:
+        prod_js = (js_obj.get("products") or [None])[0] or {}
+        js_sizes = prod_js.get("product_options") or {}
+        cfg_opts = prod_js.get("configuration_options") or {}
+
+        # sizes index
+        size_idx: Dict[int, Tuple[str, float]] = {}
+        for sid, sd in js_sizes.items():
+            try:
+                size_idx[int(sid)] = (
+                    _canonical_size(
+                        (sd.get("size_name") or {}).get("en", "")
+                        or str(sd.get("size") or "")
+                    ),
+                    float(sd.get("base_price")),
+                )
+            except Exception:
+                continue
+
+        # dough/crust deltas per size
+        for opt_id, od in cfg_opts.items():
+            if str(od.get("subconfiguration_id", "")).lower() != "dough":
+                continue
+            crust_label = id2title.get(opt_id) or opt_id
+            crust_label = _canonical_crust(crust_label)
+            per_size = od.get("product_options") or {}
+            for sid, (sz_name, base_price) in size_idx.items():
+                ps = per_size.get(str(sid))
+                if ps is None:
+                    continue
+                delta = num(ps.get("price"))
+                delta = 0.0 if delta is None else float(delta)
+                variants.append(
+                    (
+                        sz_name,
+                        crust_label,
+                        round(max(0.0, base_price + delta), 2),
+                    )
+                )
+    except Exception:
+        return tuple(variants), False
+
+    return tuple(variants), True
+
+
 def parse_config_prices(
     config: dict,
     starting_price: Optional[float],
@@ -586,18 +910,13 @@ def parse_config_prices(
     variants: List[Tuple[str, str, float]] = []
 
     # ---------- 0) Try js_data (authoritative for per-size crust deltas) ----------
-    js_obj = _decode_js_data(config.get("js_data", ""))
-    try:
-        og_prod = (config.get("data") or {}).get("products")[0]
-    except Exception:
-        og_prod = None
-
-    if isinstance(js_obj, dict):
+    js_data = config.get("js_data", "")
+    if js_data and isinstance(js_data, str):
+        try:
+            og_prod = (config.get("data") or {}).get("products")[0]
+        except Exception:
+            og_prod = None
         try:
-            prod_js = (js_obj.get("products") or [None])[0] or {}
-            js_sizes = prod_js.get("product_options") or {}
-            cfg_opts = prod_js.get("configuration_options") or {}
-
             # map id -> title using original configuration_options
             id2title: Dict[str, str] = {}
             if og_prod and isinstance(og_prod.get("configuration_options"), list):
@@ -606,57 +925,30 @@ def parse_config_prices(
                     title = o.get("title") or o.get("name") or o.get("label")
                     if oid and title:
                         id2title[str(oid)] = str(title)
+        except Exception:
+            id2title = None  # malformed options: js_data can't be trusted
 
-            # sizes index
-            size_idx: Dict[int, Tuple[str, float]] = {}
-            for sid, sd in js_sizes.items():
-                try:
-                    size_idx[int(sid)] = (
-                        _canonical_size(
-                            (sd.get("size_name") or {}).get("en", "")
-                            or str(sd.get("size") or "")
-                        ),
-                        float(sd.get("base_price")),
-                    )
-                except Exception:
-                    continue
-
-            # dough/crust deltas per size
-            for opt_id, od in cfg_opts.items():
-                if str(od.get("subconfiguration_id", "")).lower() != "dough":
-                    continue
-                crust_label = id2title.get(opt_id) or opt_id
-                crust_label = _canonical_crust(crust_label)
-                per_size = od.get("product_options") or {}
-                for sid, (sz_name, base_price) in size_idx.items():
-                    ps = per_size.get(str(sid))
-                    if ps is None:
-                        continue
-                    delta = num(ps.get("price"))
-                    delta = 0.0 if delta is None else float(delta)
-                    variants.append(
-                        (
-                            sz_name,
-                            crust_label,
-                            round(max(0.0, base_price + delta), 2),
-                        )
-                    )
-
-            if variants:
+        if id2title is not None:
+            js_variants, complete = _js_data_variants(
+                js_data, tuple(id2title.items())
+            )
+            variants.extend(js_variants)
+            if complete and variants:
                 return variants
-        except Exception:
-            pass  # fall through
+
+    # one walk of the config serves both fallback strategies
+    groups, priced = _index_config(config)
 
     # ---------- 1) Explicit matrix if present ----------
-    matrix = _try_price_matrix(config)
+    matrix = _try_price_matrix(config, priced)
     if matrix:
         for (sz, cr), pr in matrix.items():
             variants.append((sz, cr, pr))
         return variants
 
     # ---------- 2) Group-based fallback ----------
-    size_group = _find_group(config, SIZE_KEYS)
-    crust_group = _find_group(config, CRUST_KEYS)
+    size_group = _find_group(config, SIZE_KEYS, groups)
+    crust_group = _find_group(config, CRUST_KEYS, groups)
 
     size_opts = (size_group or {}).get("options") or []
     crust_opts = (crust_group or {}).get("options") or []
@@ -702,13 +994,19 @@ def parse_config_prices(
 
     if size_price_abs:
         if crust_opts:
-            for sz, base_p in size_price_abs.items():
-                for cr, adj in (crust_adj.items() or [("Regular Dough", 0.0)]):
-                    variants.append((sz, cr, max(0.0, base_p + adj)))
+            crust_items = list(crust_adj.items()) or [("Regular Dough", 0.0)]
+            variants.extend(
+                [
+                    (sz, cr, max(0.0, base_p + adj))
+                    for sz, base_p in size_price_abs.items()
+                    for cr, adj in crust_items
+                ]
+            )
         else:
             chosen_crust = _canonical_crust(fallback_crust or "Regular Dough")
-            for sz, base_p in size_price_abs.items():
-                variants.append((sz, chosen_crust, base_p))
+            variants.extend(
+                [(sz, chosen_crust, base_p) for sz, base_p in size_price_abs.items()]
+            )
 
     if not variants and starting_price is not None:
         default_size = "Small"
@@ -724,11 +1022,16 @@ def parse_config_prices(
 
 # ---------------- key coding for uniqueness ----------------
 
+_TWO_DIGIT_INCHES_RX = re.compile(r'^(\d{2})"\s*$')
+_NON_CODE_RX = re.compile(r"[^A-Z0-9]+")
+
+
+@lru_cache(maxsize=1024)
 def _size_code(sz: str) -> str:
     s = (sz or "").strip()
     if s.endswith('"') and s[:-1].isdigit():
         return f"{s[:-1]}IN"
-    m = re.match(r'^(\d{2})"\s*$', s)
+    m = _TWO_DIGIT_INCHES_RX.match(s)
     if m:
         return f"{m.group(1)}IN"
     sl = s.lower()
@@ -748,9 +1051,10 @@ def _size_code(sz: str) -> str:
         return "TWIN"
     if sl == "single":
         return "SINGLE"
-    return re.sub(r"[^A-Z0-9]+", "", s.upper())
+    return _NON_CODE_RX.sub("", s.upper())
 
 
+@lru_cache(maxsize=1024)
 def _crust_code(cr: str) -> str:
     c = (cr or "").strip().lower()
     if c in ("regular dough", "regular", "original", "classic"):
@@ -769,7 +1073,7 @@ def _crust_code(cr: str) -> str:
         return "GF"
     if "hand tossed" in c or "hand-tossed" in c:
         return "HANDTOSSED"
-    return re.sub(r"[^A-Z0-9]+", "", (cr or "REG").upper()) or "REG"
+    return _NON_CODE_RX.sub("", (cr or "REG").upper()) or "REG"
 
 
 def variant_product_key(pid: str, size: str, crust: str) -> str:
@@ -779,26 +1083,54 @@ def variant_product_key(pid: str, size: str, crust: str) -> str:
 
 # ---------------- main worker ----------------
 
-def scrape_store(store_id: int, today_local: dt.date) -> List[dict]:
+def scrape_store(
+    store_id: int,
+    date_key: str,
+    month: str,
+    year: str,
+    fetch_ex: Optional[ThreadPoolExecutor] = None,
+) -> List[Tuple[str, ...]]:
     """
     Scrape a single Pizza Pizza store: meta + pizza products + configurator
-    -> list of normalized rows ready for CSV.
+    -> list of normalized row tuples (in OUT_COLS order) ready for CSV.
+
+    date_key/month/year are the run's date columns, formatted once in main.
+
+    With `fetch_ex`, the per-category product lists and per-product
+    configurators are fetched concurrently on that executor (must not be the
+    one running scrape_store itself).
     """
     meta = fetch_store_meta(store_id)
     if not meta:
         return []
     store_key, city, province = meta
+    store_key_prefixed = f"PP_{store_key}"  # constant for every row of this store
 
-    products = discover_pizza_products(store_id)
+    products = discover_pizza_products(store_id, fetch_ex)
     if not products:
         return []
 
-    rows: List[dict] = []
-    seen_variant_keys: set[str] = set()  # de-dupe per store (pid,size,crust)
+    # product keys containing "product" are dropped from the output, and pid
+    # is a prefix of every key for an entry: skip those before any fetch
+    products = [e for e in products if "product" not in e["pid"].lower()]
 
-    for entry in products:
-        pid = entry["pid"]
+    def _config(entry: Dict[str, Any]) -> Optional[dict]:
         slug = entry["slug"]
+        return fetch_config(store_id, slug) if slug else None
+
+    # map() keeps product order, so de-dupe below is unchanged
+    if fetch_ex is not None:
+        configs = list(fetch_ex.map(_config, products))
+    else:
+        configs = [_config(e) for e in products]
+
+    rows: List[Tuple[str, ...]] = []
+    # de-dupe per store on (pid, size code, crust code): codes never contain
+    # "_", so this tuple maps 1:1 onto the product key built from it
+    seen_variant_keys: set[Tuple[str, str, str]] = set()
+
+    for entry, config in zip(products, configs):
+        pid = entry["pid"]
         name = entry["name"]
         start_price = entry["start_price"]
         cat_names = entry["cat_names"]
@@ -813,42 +1145,43 @@ def scrape_store(store_id: int, today_local: dt.date) -> List[dict]:
         # Contextual crust inference from categories + recipe (fallback only)
         context_crust = infer_crust_from_context(recipe, cat_names)
 
-        config = fetch_config(store_id, slug) if slug else None
         variants = parse_config_prices(
             config or {},
             start_price,
             fallback_crust=context_crust,
         )
 
-        date_key = today_local.isoformat()
-        month = today_local.strftime("%B")
-        year = str(today_local.year)
-
         for sz, cr, price in variants:
             size_val = norm_label(sz) or "Small"
             crust_val = norm_label(cr) or "Regular Dough"
-            pk = variant_product_key(pid, size_val, crust_val)
+            vk = (pid, _size_code(size_val), _crust_code(crust_val))
 
-            if pk in seen_variant_keys:
+            if vk in seen_variant_keys:
+                continue
+            seen_variant_keys.add(vk)
+            pk = "_".join(vk)  # == variant_product_key(pid, size_val, crust_val)
+            # size/crust codes come from free-form labels and can still
+            # spell "product" (case-insensitive); drop those keys too
+            if "product" in pk.lower():
                 continue
-            seen_variant_keys.add(pk)
 
+            # column order matches OUT_COLS
             rows.append(
-                {
-                    "chain_key": CHAIN_KEY,
-                    "store_key": f"PP_{store_key}",
-                    "city": city,
-                    "province": province,
-                    "category": "Pizza",
-                    "recipe": recipe,
-                    "product_key": f"PP_{pk}",  # prefixed for pipeline
-                    "size": size_val,
-                    "crust": crust_val,
-                    "price": f"{float(price):.2f}",
-                    "date_key": date_key,
-                    "month": month,
-                    "year": year,
-                }
+                (
+                    CHAIN_KEY,
+                    store_key_prefixed,
+                    city,
+                    province,
+                    "Pizza",
+                    recipe,
+                    f"PP_{pk}",  # prefixed for pipeline
+                    size_val,
+                    crust_val,
+                    f"{float(price):.2f}",
+                    date_key,
+                    month,
+                    year,
+                )
             )
 
     return rows
@@ -857,7 +1190,7 @@ def scrape_store(store_id: int, today_local: dt.date) -> List[dict]:
 # ---------------- entrypoint ----------------
 
 def main() -> None:
-    global SESSION_TOKEN
+    global SESSION_TOKEN, _session
 
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -872,7 +1205,7 @@ def main() -> None:
         "--outfile",
         default=None,
         help=(
-            "CSV output path "
+            "CSV output path; ending in .csv.gz writes gzip'd CSV "
             "(default: data/raw/menu_pizzapizza_ca_menu_YYYYMMDD.csv)"
         ),
     )
@@ -897,72 +1230,74 @@ def main() -> None:
 
     if args.token:
         SESSION_TOKEN = args.token
-        if hasattr(_thread, "s"):
-            delattr(_thread, "s")  # force new session with new token
 
     ids = list(parse_id_range(args.ids))
     pool = max(1, args.pool)
+
+    # one keep-alive pool for all workers, sized from --pool (and token)
+    _session = make_session(SESSION_TOKEN, pool_size=pool)
     today_local = today_toronto()
     today_tag = today_local.strftime("%Y%m%d")
-
-    out_cols = [
-        "chain_key",
-        "store_key",
-        "city",
-        "province",
-        "category",
-        "recipe",
-        "product_key",
-        "size",
-        "crust",
-        "price",
-        "date_key",
-        "month",
-        "year",
-    ]
+    # constant for the whole run: format once, not per product
+    date_key = today_local.isoformat()
+    month = today_local.strftime("%B")
+    year = str(today_local.year)
 
     default_out = OUTPUT_DIR / f"menu_pizzapizza_ca_menu_{today_tag}.csv"
     outfile = Path(args.outfile) if args.outfile else default_out
 
-    all_rows: List[dict] = []
     print(
         f"Starting Pizza Pizza (Pizza only) scrape… "
         f"stores={len(ids)} pool={pool}"
     )
 
-    with ThreadPoolExecutor(max_workers=pool) as ex:
-        futs = {
-            ex.submit(scrape_store, sid, today_local): sid for sid in ids
-        }
-        for fut in tqdm(
-            as_completed(futs),
-            total=len(futs),
-            desc="Stores",
-        ):
-            try:
-                all_rows.extend(fut.result())
-            except Exception:
-                # keep going if a single store fails
-                pass
-
-    # FINAL FILTER: drop any rows whose product_key contains "product" (case-insensitive)
-    filtered_rows = [
-        r
-        for r in all_rows
-        if "product"
-        not in str(r.get("product_key", "")).lower()
-    ]
-
-    with outfile.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=out_cols)
-        writer.writeheader()
-        for r in filtered_rows:
-            writer.writerow({k: r.get(k, "") for k in out_cols})
-
-    stores_done = len({r["store_key"] for r in filtered_rows})
+    # Rows stream straight from finished stores into the CSV, so memory is
+    # bounded by the stores in flight rather than the whole run.
+    rows_written = 0
+    stores_with_rows: set[str] = set()
+    if outfile.name.endswith(".gz"):
+        out_ctx = gzip.open(
+            outfile, "wt", compresslevel=GZIP_LEVEL,
+            encoding="utf-8", newline="",
+        )
+    else:
+        out_ctx = outfile.open(
+            "w", newline="", encoding="utf-8", buffering=CSV_BUFFER_BYTES
+        )
+    with out_ctx as f:
+        writer = csv.writer(f)
+        writer.writerow(OUT_COLS)
+
+        # a separate fetch pool for in-store requests: store workers block on
+        # its futures, so sharing one executor could deadlock once every
+        # worker waits. Both pools stay within the session's pool*2 connections.
+        with ThreadPoolExecutor(max_workers=pool) as fetch_ex, \
+                ThreadPoolExecutor(max_workers=pool) as ex:
+            futs = {
+                ex.submit(
+                    scrape_store, sid, date_key, month, year, fetch_ex
+                ): sid
+                for sid in ids
+            }
+            for fut in tqdm(
+                as_completed(futs),
+                total=len(futs),
+                desc="Stores",
+            ):
+                try:
+                    rows = fut.result()
+                except Exception:
+                    # keep going if a single store fails
+                    continue
+
+                if rows:
+                    writer.writerows(rows)
+                    rows_written += len(rows)
+                    stores_with_rows.add(rows[0][1])
+
     print(
-        f"DONE → {outfile}  rows={len(filtered_rows)}  "
-        f"stores={stores_done}  pool={pool}"
+        f"DONE → {outfile}  rows={rows_written}  "
+        f"stores={len(stores_with_rows)}  pool={pool}"
     )
 
 